@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+## @file batch_find_nao.py Script for finding the Nao robot in many videos with a process pool.
+
+
+import argparse
+import glob
+import multiprocessing
+import os
+import time
+from find_nao_vid import save_keypoints
+from find_nao_vid import track_video
+
+
+def output_path(video_file, output_dir):
+    # Keypoint file of a video, named after it with a .positions extension.
+    name = os.path.splitext(os.path.basename(video_file))[0] + '.positions'
+    return os.path.join(output_dir or os.path.dirname(os.path.abspath(video_file)), name)
+
+
+def track_one(job):
+    # Track one video in a pool worker and save its keypoints. Returns the video,
+    # frame count, seconds taken, the worker's process id and the error that
+    # stopped it, None if there was none. Nothing is saved for videos that can't
+    # be read or fail, so they are retried on the next run.
+    video_file, path, n_threads = job
+    t_start = time.time()
+    try:
+        all_keypoints = track_video(video_file, n_threads, headless=True)
+        if all_keypoints:
+            save_keypoints(path, all_keypoints)
+    except Exception as e:
+        return video_file, 0, time.time() - t_start, os.getpid(), "%s: %s" % (type(e).__name__, e)
+    return video_file, len(all_keypoints), time.time() - t_start, os.getpid(), None
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('videos', nargs='+',
+                        help='video files or glob patterns')
+    parser.add_argument('-d', '--output-dir',
+                        help='where to write the .positions files, defaults to next to each video')
+    parser.add_argument('-p', '--processes', type=int, default=multiprocessing.cpu_count(),
+                        help='number of videos to track at once')
+    parser.add_argument('-j', '--threads', type=int, default=1,
+                        help='detection threads per video')
+    parser.add_argument('-f', '--force', action='store_true',
+                        help='track videos that already have a .positions file again')
+    args = parser.parse_args()
+
+    # Expand patterns the shell didn't, listing each video once.
+    videos = []
+    seen = set()
+    for pattern in args.videos:
+        matches = sorted(glob.glob(pattern))
+        for video_file in matches if matches else [pattern]:
+            if os.path.abspath(video_file) not in seen:
+                seen.add(os.path.abspath(video_file))
+                videos.append(video_file)
+
+    # Videos with the same name would share a .positions file, so one of them
+    # would be skipped as done or both would write it at once.
+    paths = {}
+    for video_file in videos:
+        paths.setdefault(output_path(video_file, args.output_dir), []).append(video_file)
+    clashes = [path + ": " + ", ".join(files) for path, files in sorted(paths.items()) if len(files) > 1]
+    if clashes:
+        parser.error("videos would write the same .positions file:\n  " + "\n  ".join(clashes))
+
+    if args.output_dir and not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+
+    # Only finished files exist under their final name, so anything already
+    # there is complete and can be skipped.
+    jobs = []
+    for video_file in videos:
+        path = output_path(video_file, args.output_dir)
+        if os.path.exists(path) and not args.force:
+            print("Skipping " + video_file + ", " + path + " exists")
+            continue
+        jobs.append((video_file, path, args.threads))
+
+    if not jobs:
+        return
+
+    t_start = time.time()
+    worker_frames = {}
+    worker_seconds = {}
+    total_frames = 0
+    failed = []
+    pool = multiprocessing.Pool(min(args.processes, len(jobs)))
+    try:
+        for video_file, n_frames, seconds, pid, error in pool.imap_unordered(track_one, jobs):
+            if error is not None:
+                print(video_file + ": failed, " + error)
+                failed.append((video_file, error))
+                continue
+            if not n_frames:
+                print(video_file + ": no frames could be read")
+                failed.append((video_file, "no frames could be read"))
+                continue
+            print("%s: %d frames in %.2f s, %.1f frames/s" %
+                  (video_file, n_frames, seconds, n_frames / max(seconds, 1e-9)))
+            worker_frames[pid] = worker_frames.get(pid, 0) + n_frames
+            worker_seconds[pid] = worker_seconds.get(pid, 0.0) + seconds
+            total_frames += n_frames
+    except BaseException:
+        # Don't wait for the videos still queued, e.g. on Ctrl-C.
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    elapsed = time.time() - t_start
+
+    print("%10s %10s %12s %12s" % ('worker', 'frames', 'seconds', 'frames/s'))
+    for pid in sorted(worker_frames):
+        print("%10d %10d %12.2f %12.1f" % (pid, worker_frames[pid], worker_seconds[pid],
+                                           worker_frames[pid] / max(worker_seconds[pid], 1e-9)))
+    print("%d videos, %d frames in %.2f s, %.1f frames/s overall" %
+          (len(jobs), total_frames, elapsed, total_frames / max(elapsed, 1e-9)))
+    if failed:
+        print("%d videos failed and have no .positions file:" % len(failed))
+        for video_file, error in failed:
+            print("  %s: %s" % (video_file, error))
+
+if __name__ == '__main__':
+    main()
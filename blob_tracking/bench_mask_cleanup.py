@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+## @file bench_mask_cleanup.py Script for comparing the speed and keypoints of the mask cleanups.
+
+import argparse
+import numpy as np
+import time
+from find_nao_vid import CLEANUP_METHODS
+from find_nao_vid import MaskCleanup
+from find_nao_vid import create_detector
+from find_nao_vid import find_keypoints
+from video_chunks import open_video_at
+from video_chunks import read_frames
+
+
+def match_keypoints(reference, keypoints, max_dist):
+    # Pair each reference keypoint with the nearest keypoint. Returns the number
+    # matched within max_dist, their distances and the number of extra keypoints.
+    errors = []
+    unused = list(keypoints)
+    for x, y in reference:
+        if not unused:
+            break
+        dists = [np.hypot(x - u, y - v) for u, v in unused]
+        nearest = int(np.argmin(dists))
+        if dists[nearest] <= max_dist:
+            errors.append(dists[nearest])
+            del unused[nearest]
+    return len(errors), errors, len(unused)
+
+
+def run_cleanup(frames, cleanup):
+    # Detect the keypoints of every frame. Returns them with the seconds taken.
+    detector = create_detector()
+    all_keypoints = []
+    t_start = time.time()
+    for frame in frames:
+        keypoints, mask = find_keypoints(frame, detector, cleanup)
+        all_keypoints.append([kp.pt for kp in keypoints])
+    return all_keypoints, time.time() - t_start
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('video_file', nargs='+')
+    parser.add_argument('-n', '--frames', type=int, default=100,
+                        help='frames of each video to time')
+    parser.add_argument('--scales', type=int, nargs='+', default=[2, 4],
+                        help='scales of the downscale and components cleanups')
+    parser.add_argument('--max-dist', type=float, default=5.0,
+                        help='pixels a keypoint may move and still match')
+    args = parser.parse_args()
+
+    cases = [('close', 1), ('separable', 1)]
+    cases += [(method, scale) for method in CLEANUP_METHODS[2:] for scale in args.scales]
+
+    print("%-24s %-12s %5s %8s %10s %8s %8s %8s %8s" %
+          ('video', 'cleanup', 'scale', 'ms/frame', 'speedup', 'matched', 'extra', 'mean px', 'max px'))
+    for video_file in args.video_file:
+        cap = open_video_at(video_file, 0)
+        frames = list(read_frames(cap, 0, args.frames))
+        cap.release()
+        if not frames:
+            print("%-24s no frames" % video_file)
+            continue
+
+        # The original closing is the reference for both speed and keypoints.
+        reference, reference_time = run_cleanup(frames, None)
+        n_reference = sum(len(keypoints) for keypoints in reference)
+        for method, scale in cases:
+            all_keypoints, seconds = run_cleanup(frames, MaskCleanup(method, scale))
+            n_matched = 0
+            n_extra = 0
+            errors = []
+            for ref_keypoints, keypoints in zip(reference, all_keypoints):
+                matched, dists, extra = match_keypoints(ref_keypoints, keypoints, args.max_dist)
+                n_matched += matched
+                n_extra += extra
+                errors += dists
+            print("%-24s %-12s %5d %8.2f %9.2fx %7.1f%% %8d %8.2f %8.2f" %
+                  (video_file[-24:], method, scale, 1000.0 * seconds / len(frames),
+                   reference_time / max(seconds, 1e-9), 100.0 * n_matched / max(n_reference, 1), n_extra,
+                   np.mean(errors) if errors else 0.0, max(errors) if errors else 0.0))
+
+if __name__ == '__main__':
+    main()
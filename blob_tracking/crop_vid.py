@@ -27,7 +27,19 @@
 import argparse
 import cv2
 from threading import Thread
+import os
 import sys
+from video_chunks import concatenate_videos
+from video_chunks import map_chunks
+from video_chunks import open_video_at
+from video_chunks import read_frames
+from video_chunks import segment_file
+
+# Python 2's input evaluates what is typed, raw_input is the one that reads it.
+try:
+    input = raw_input
+except NameError:
+    pass
 
 
 class DisplayImageThread (Thread):
@@ -67,7 +79,7 @@ def ask_user_about_extents(extents):
 
     while True:
         # Get choice.
-        choice = raw_input(prompt).lower()
+        choice = input(prompt).lower()
 
         # Check to see if the choice is a number.
         try:
@@ -123,6 +135,25 @@ def prompt_and_crop(filename, extents):
     return crop_good, extents
 
 
+def crop_range(in_file, start_frame, end_frame, n_chunk, extents, out_file):
+    # Crop the frames from start_frame up to end_frame into a segment of
+    # out_file, for map_chunks. Returns the name of the segment.
+    cap = open_video_at(in_file, start_frame)
+    # Create the writer.
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    width = extents[1] - extents[0]
+    height = extents[3] - extents[2]
+    part_file = segment_file(out_file, n_chunk)
+    out = cv2.VideoWriter(part_file, fourcc, int(cap.get(cv2.CAP_PROP_FPS)), (width, height))
+
+    for frame in read_frames(cap, start_frame, end_frame):
+        out.write(crop_frame(frame, extents))
+
+    cap.release()
+    out.release()
+    return part_file
+
+
 def main():
     # Get command line args.
     parser = argparse.ArgumentParser()
@@ -138,6 +169,8 @@ def main():
                         help='pixel on the bottom of the image to crop to')
     parser.add_argument('-y', action='store_true',
                         help='check cropping by displaying sample image')
+    parser.add_argument('-c', '--chunks', type=int, default=1,
+                        help='split the video into this many frame ranges done in parallel processes')
     args = parser.parse_args()
 
     # Get video file.
@@ -153,7 +186,7 @@ def main():
     # Image extents [x1, x2, y1, y2]
     extents = [0, cols, 0, rows]
 
-    print "Video extents are: " + str(extents)
+    print("Video extents are: " + str(extents))
 
     try:
         extents[0] = int(args.x1)
@@ -169,7 +202,13 @@ def main():
         crop_good, extents = prompt_and_crop(args.in_file, extents)
 
     # Check to see if the user was happy with the rotation.
-    if crop_good:
+    if crop_good and args.chunks > 1:
+        # Crop frame ranges in parallel, then join the segments.
+        segments = map_chunks(crop_range, args.in_file, args.chunks, extra_args=(extents, 'out.avi'))
+        concatenate_videos(segments, 'out.avi')
+        for part_file in segments:
+            os.remove(part_file)
+    elif crop_good:
         # Get video file.
         cap = cv2.VideoCapture(args.in_file)
         # Create the writer.
@@ -201,12 +240,14 @@ def main():
             sys.stdout.flush()
 
         # Newline for command prompt.
-        print '\n'
+        print('\n')
         cap.release()
         out.release()
 
-    # Clean up.
-    cv2.destroyAllWindows()
+    # Clean up. Only the -y sample opens windows, and OpenCV builds without a
+    # GUI can't destroy them.
+    if args.y:
+        cv2.destroyAllWindows()
 
 if __name__ == '__main__':
     main()
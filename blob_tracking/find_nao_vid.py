@@ -24,26 +24,52 @@
 
 ## @file find_blob_vid.py Script for finding the Nao robot's orange colors in video.
 
+
 import argparse
 import cv2
+import math
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+from threading import Event
+from threading import Thread
+import time
+from video_chunks import map_chunks
+from video_chunks import open_video_at
+from video_chunks import read_frames
 
+try:
+    import queue
+except ImportError:
+    import Queue as queue
 
-def main():
-    # Get command line args.
-    parser = argparse.ArgumentParser()
-    parser.add_argument('video_file')
-    args = parser.parse_args()
+# Marks the end of the frames on a queue.
+_END = None
 
-    # Get video file.
-    cap = cv2.VideoCapture(args.video_file)
+# Seconds a thread waits on a queue before checking whether it should stop.
+QUEUE_POLL = 0.1
+
+# define range of Nao's orange color in HSV
+LOWER_ORANGE = np.array([0, 120, 50])
+UPPER_ORANGE = np.array([25, 255, 255])
 
-    # Surrogate datatypes for scatter plot.
-    # TODO: Get rid of this.
-    all_keypoints_x = []
-    all_keypoints_y = []
+LOWER_REDDISH = np.array([350, 95, 200])
+UPPER_REDDISH = np.array([360, 160, 160])
 
+# Closing and opening kernels to filter out holes and spots.
+CLOSE_SIZE = 50
+CLOSE_KERNEL = np.ones((CLOSE_SIZE, CLOSE_SIZE), np.uint8)
+OPEN_KERNEL = np.ones((10, 10), np.uint8)
+
+# Ways of cleaning up the mask, see MaskCleanup.
+CLEANUP_METHODS = ('close', 'separable', 'downscale', 'components')
+
+# Blob areas the detector keeps, in pixels. The largest is the OpenCV default.
+MIN_BLOB_AREA = 120
+MAX_BLOB_AREA = 5000
+
+
+def create_detector():
     # Setup SimpleBlobDetector.
     params = cv2.SimpleBlobDetector_Params()
 
@@ -62,68 +88,421 @@ def main():
     # Look for white blobs.
     params.blobColor = 255
     # Blobs can't be too small.
-    params.minArea = 120
+    params.minArea = MIN_BLOB_AREA
+    params.maxArea = MAX_BLOB_AREA
 
     # Set up the detector with default parameters.
-    detector = cv2.SimpleBlobDetector_create(params)
+    return cv2.SimpleBlobDetector_create(params)
+
+
+class MaskCleanup:
+    def __init__(self, method='close', scale=2):
+        # How the color mask is cleaned up before the blobs are found:
+        #   close       The original closing with a square kernel.
+        #   separable   The same closing as a row pass and a column pass, which
+        #               gives the same mask.
+        #   downscale   The closing on the mask shrunk by scale, grown back after.
+        #               Any pixel set in a shrunk cell sets the whole cell.
+        #   components  The downscaled closing, then connected components of the
+        #               right area are the blobs instead of SimpleBlobDetector's.
+        if method not in CLEANUP_METHODS:
+            raise ValueError("unknown mask cleanup " + str(method))
+        self.method = method
+        self.scale = max(1, int(scale)) if method in ('downscale', 'components') else 1
+        # The 50 pixel kernel moves blobs a pixel down and right, an even kernel
+        # on the shrunk mask would move them a whole cell, so it is kept odd.
+        size = int(round(CLOSE_SIZE / float(self.scale))) | 1 if self.scale > 1 else CLOSE_SIZE
+        self.kernel = np.ones((size, size), np.uint8)
+        self.row_kernel = np.ones((1, CLOSE_SIZE), np.uint8)
+        self.col_kernel = np.ones((CLOSE_SIZE, 1), np.uint8)
+
+    def _shrink(self, mask):
+        rows, cols = mask.shape
+        small = cv2.resize(mask, (max(1, cols // self.scale), max(1, rows // self.scale)),
+                           interpolation=cv2.INTER_AREA)
+        return cv2.threshold(small, 0, 255, cv2.THRESH_BINARY)[1]
 
-    while(cap.isOpened()):
+    def clean(self, mask):
+        if self.method == 'separable':
+            mask = cv2.dilate(cv2.dilate(mask, self.row_kernel), self.col_kernel)
+            return cv2.erode(cv2.erode(mask, self.row_kernel), self.col_kernel)
+        if self.method == 'close' or self.scale == 1:
+            return cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self.kernel)
 
-        # Read video frame
-        ret, frame = cap.read()
+        small = cv2.morphologyEx(self._shrink(mask), cv2.MORPH_CLOSE, self.kernel)
+        return cv2.resize(small, (mask.shape[1], mask.shape[0]), interpolation=cv2.INTER_NEAREST)
 
-        # Check to see if frame is valid
-        if not ret:
-            break
+    def detect(self, mask, detector):
+        # Keypoints of the blobs in a color mask and the cleaned up mask.
+        if self.method != 'components':
+            mask = self.clean(mask)
+            return detector.detect(mask), mask
 
-        # Convert BGR to HSV
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        small = mask if self.scale == 1 else self._shrink(mask)
+        small = cv2.morphologyEx(small, cv2.MORPH_CLOSE, self.kernel)
+        n_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(small, connectivity=8)
+        keypoints = []
+        # Label 0 is the background.
+        for label in range(1, n_labels):
+            area = stats[label, cv2.CC_STAT_AREA] * self.scale * self.scale
+            if MIN_BLOB_AREA <= area <= MAX_BLOB_AREA:
+                # Centers of shrunk cells sit in the middle of the pixels they cover.
+                x = centroids[label, 0] * self.scale + (self.scale - 1) / 2.0
+                y = centroids[label, 1] * self.scale + (self.scale - 1) / 2.0
+                keypoints.append(cv2.KeyPoint(float(x), float(y), float(2.0 * math.sqrt(area / math.pi))))
+        if self.scale > 1:
+            small = cv2.resize(small, (mask.shape[1], mask.shape[0]), interpolation=cv2.INTER_NEAREST)
+        return keypoints, small
 
-        # define range of Nao's orange color in HSV
-        lower_orange = np.array([0, 120, 50])
-        upper_orange = np.array([25, 255, 255])
 
-        lower_reddish = np.array([350, 95, 200])
-        upper_reddish = np.array([360, 160, 160])
+def find_keypoints(frame, detector, cleanup=None):
+    # Find the Nao's orange blobs in a BGR frame. Returns the keypoints and the
+    # mask they were found in. The mask is cleaned up by the original closing
+    # unless another MaskCleanup is given.
 
-        # Threshold the HSV image to get only orange colors
-        mask_orange = cv2.inRange(hsv, lower_orange, upper_orange)
-        mask_reddish = cv2.inRange(hsv, lower_reddish, upper_reddish)
-        mask = cv2.bitwise_or(mask_orange, mask_reddish)
+    # Convert BGR to HSV
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
 
+    # Threshold the HSV image to get only orange colors
+    mask_orange = cv2.inRange(hsv, LOWER_ORANGE, UPPER_ORANGE)
+    mask_reddish = cv2.inRange(hsv, LOWER_REDDISH, UPPER_REDDISH)
+    mask = cv2.bitwise_or(mask_orange, mask_reddish)
+
+    if cleanup is None:
         # Do a closing and opening to filter out holes and spots
-        close_kernel = np.ones((50, 50), np.uint8)
-        open_kernel = np.ones((10, 10), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, close_kernel)
-        # mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, open_kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, CLOSE_KERNEL)
+        # mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, OPEN_KERNEL)
 
         # Detect blobs.
-        keypoints = detector.detect(mask)
+        return detector.detect(mask), mask
+
+    return cleanup.detect(mask, detector)
+
+
+class BlobTracker:
+    def __init__(self, detector, margin=60, refresh=0, cleanup=None, first_frame=0):
+        # Search only a window around where the blobs are expected, predicted by
+        # assuming they keep the velocity they had between the last two frames.
+        # The window is the box around the last keypoints grown by margin pixels
+        # and by the velocity. The full frame is searched when nothing is found in
+        # the window, and on frames numbered a multiple of refresh if refresh is
+        # set, so blobs that appear elsewhere are picked up too. first_frame is
+        # the number of the first frame given to find, so a frame range of a video
+        # is refreshed on the same frames as the whole video.
+        self.detector = detector
+        self.margin = margin
+        self.refresh = refresh
+        self.cleanup = cleanup
+        # Box around the last keypoints as [x1, y1, x2, y2], None when lost.
+        self.box = None
+        self.center = None
+        self.velocity = (0.0, 0.0)
+        self.window_frames = 0
+        self.full_frames = 0
+        self.n_frame = first_frame
+
+    def predict_window(self, shape):
+        # Window to search next as [x1, y1, x2, y2], clipped to the frame.
+        vx, vy = self.velocity
+        grow = self.margin + max(abs(vx), abs(vy))
+        rows, cols = shape[:2]
+        return [int(max(0, math.floor(self.box[0] + vx - grow))),
+                int(max(0, math.floor(self.box[1] + vy - grow))),
+                int(min(cols, math.ceil(self.box[2] + vx + grow))),
+                int(min(rows, math.ceil(self.box[3] + vy + grow)))]
+
+    def update(self, keypoints):
+        if not keypoints:
+            self.box = None
+            self.center = None
+            self.velocity = (0.0, 0.0)
+            return
+
+        points = np.array([keypoint.pt for keypoint in keypoints])
+        radii = np.array([keypoint.size / 2.0 for keypoint in keypoints])
+        self.box = [(points[:, 0] - radii).min(), (points[:, 1] - radii).min(),
+                    (points[:, 0] + radii).max(), (points[:, 1] + radii).max()]
+        center = points.mean(axis=0)
+        if self.center is not None:
+            self.velocity = (center[0] - self.center[0], center[1] - self.center[1])
+        self.center = center
+
+    def find(self, frame):
+        # Same as find_keypoints, searching the predicted window when there is one.
+        keypoints = []
+        refresh = self.refresh and self.n_frame % self.refresh == 0
+        self.n_frame += 1
+        if self.box is not None and not refresh:
+            x1, y1, x2, y2 = self.predict_window(frame.shape)
+            window_keypoints, window_mask = find_keypoints(frame[y1:y2, x1:x2], self.detector, self.cleanup)
+            if window_keypoints:
+                # Back to frame coordinates.
+                keypoints = [cv2.KeyPoint(keypoint.pt[0] + x1, keypoint.pt[1] + y1, keypoint.size)
+                             for keypoint in window_keypoints]
+                mask = np.zeros(frame.shape[:2], np.uint8)
+                mask[y1:y2, x1:x2] = window_mask
+                self.window_frames += 1
+
+        if not keypoints:
+            # Lost, or time for a refresh.
+            keypoints, mask = find_keypoints(frame, self.detector, self.cleanup)
+            self.full_frames += 1
+
+        self.update(keypoints)
+        return keypoints, mask
+
+
+def draw_keypoints(frame, mask, keypoints):
+    # Bitwise-AND mask and original image
+    frame_masked = cv2.bitwise_and(frame, frame, mask=mask)
+
+    # Draw detected blobs as red circles.
+    # cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS ensures the size of the circle corresponds to the size of blob
+    return cv2.drawKeypoints(frame_masked, keypoints, np.array([]), (0, 0, 255),
+                             cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
+
+
+def _put(items, item, stop):
+    # Put an item on a bounded queue, giving up once stop is set. Returns whether
+    # it was put.
+    while not stop.is_set():
+        try:
+            items.put(item, timeout=QUEUE_POLL)
+            return True
+        except queue.Full:
+            pass
+    return False
 
-        for keypoint in keypoints:
-            all_keypoints_x.append(keypoint.pt[0])
-            all_keypoints_y.append(keypoint.pt[1])
 
-         # Bitwise-AND mask and original image
-        frame_masked = cv2.bitwise_and(frame, frame, mask=mask)
+def _get(items, stop):
+    # Get an item from a queue, or _END once stop is set.
+    while not stop.is_set():
+        try:
+            return items.get(timeout=QUEUE_POLL)
+        except queue.Empty:
+            pass
+    return _END
 
-        # Draw detected blobs as red circles.
-        # cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS ensures the size of the circle corresponds to the size of blob
-        im_with_keypoints = cv2.drawKeypoints(frame_masked, keypoints, np.array([]), (0, 0, 255), cv2.DRAW_MATCHES_FLAGS_DRAW_RICH_KEYPOINTS)
 
-        # Show keypoints
-        cv2.imshow("Keypoints", im_with_keypoints)
-        # cv2.imshow("Mask", mask)
-        # cv2.waitKey(10)
-        if cv2.waitKey(10) & 0xFF == ord('q'):
-            break
+class DecodeThread (Thread):
+    def __init__(self, cap, frames, results, n_workers, stop, start_frame=0, end_frame=None):
+        Thread.__init__(self)
+        # Don't keep the process alive if the collecting thread is gone.
+        self.daemon = True
+        self.cap = cap
+        self.frames = frames
+        self.results = results
+        self.n_workers = n_workers
+        self.stop = stop
+        self.start_frame = start_frame
+        self.end_frame = end_frame
+
+    def run(self):
+        try:
+            # Number the frames so the results can be put back in order.
+            n_frame = 0
+            for frame in read_frames(self.cap, self.start_frame, self.end_frame):
+                if not _put(self.frames, (n_frame, frame), self.stop):
+                    return
+                n_frame += 1
+
+            # One end marker for each worker.
+            for _ in range(self.n_workers):
+                if not _put(self.frames, _END, self.stop):
+                    return
+        except Exception as e:
+            # Hand the error to the collecting thread to raise.
+            _put(self.results, e, self.stop)
+
+
+class DetectThread (Thread):
+    def __init__(self, frames, results, keep_frames, stop, tracker=None, cleanup=None):
+        Thread.__init__(self)
+        self.daemon = True
+        self.frames = frames
+        self.results = results
+        self.keep_frames = keep_frames
+        self.stop = stop
+        # Detectors are not shared between threads.
+        self.detector = create_detector()
+        self.tracker = tracker
+        self.cleanup = cleanup
+
+    def run(self):
+        try:
+            while True:
+                item = _get(self.frames, self.stop)
+                if item is _END:
+                    _put(self.results, _END, self.stop)
+                    return
+
+                n_frame, frame = item
+                if self.tracker is not None:
+                    keypoints, mask = self.tracker.find(frame)
+                else:
+                    keypoints, mask = find_keypoints(frame, self.detector, self.cleanup)
+                points = [keypoint.pt for keypoint in keypoints]
+                shown = (frame, mask, keypoints) if self.keep_frames else None
+                if not _put(self.results, (n_frame, points, shown), self.stop):
+                    return
+        except Exception as e:
+            # Hand the error to the collecting thread to raise.
+            _put(self.results, e, self.stop)
+
+
+def track_video(video_file, n_workers=4, headless=False, queue_size=8, start_frame=0, end_frame=None,
+                tracker=None, cleanup=None):
+    # Find the Nao in every frame of a video. Frames are decoded on one thread,
+    # searched on n_workers detection threads and collected back in frame order,
+    # with bounded queues between the stages. OpenCV releases the GIL while it
+    # works, so the threads run in parallel. Unless headless, every frame is shown
+    # as it comes in and q stops early. Only frames from start_frame up to
+    # end_frame are tracked, to the end of the video if end_frame is None. With a
+    # BlobTracker the frames depend on the ones before them, so they are all
+    # searched on one detection thread. cleanup is a MaskCleanup, the original
+    # closing if None. Returns a list with the (x, y) keypoints of each frame.
+    # An error on any of the threads, or an interrupt, stops them all and is
+    # raised here.
+    if tracker is not None:
+        n_workers = 1
+    cap = open_video_at(video_file, start_frame)
+    frames = queue.Queue(maxsize=queue_size)
+    results = queue.Queue(maxsize=queue_size)
+    stop = Event()
+
+    threads = [DecodeThread(cap, frames, results, n_workers, stop, start_frame, end_frame)]
+    threads += [DetectThread(frames, results, not headless, stop, tracker, cleanup) for _ in range(n_workers)]
+    for thread in threads:
+        thread.start()
+
+    # Hold results that finish early until the frames before them are in.
+    all_keypoints = []
+    pending = {}
+    n_running = n_workers
+    try:
+        while n_running and not stop.is_set():
+            item = results.get()
+            if item is _END:
+                n_running -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+
+            pending[item[0]] = item
+            while len(all_keypoints) in pending:
+                n_frame, points, shown = pending.pop(len(all_keypoints))
+                all_keypoints.append(points)
+
+                if not headless:
+                    # Show keypoints
+                    cv2.imshow("Keypoints", draw_keypoints(*shown))
+                    if cv2.waitKey(10) & 0xFF == ord('q'):
+                        stop.set()
+                        break
+    finally:
+        # Every thread stops waiting on the queues once stop is set.
+        stop.set()
+        for thread in threads:
+            thread.join()
+        cap.release()
+
+    return all_keypoints
+
+
+def track_chunk(video_file, start_frame, end_frame, n_chunk, n_workers=1, window_margin=None, refresh=0,
+                cleanup=None):
+    # Headless track_video of one frame range, for map_chunks. Each range gets its
+    # own BlobTracker if window_margin is set, see BlobTracker for refresh.
+    tracker = None
+    if window_margin is not None:
+        tracker = BlobTracker(create_detector(), window_margin, refresh, cleanup, start_frame)
+    return track_video(video_file, n_workers, True, start_frame=start_frame, end_frame=end_frame,
+                       tracker=tracker, cleanup=cleanup)
+
+
+def track_video_chunked(video_file, n_chunks, n_workers=1, processes=None, window_margin=None, refresh=0,
+                        cleanup=None):
+    # Split the video into n_chunks frame ranges, track them in parallel processes
+    # and join the keypoints back in frame order. With window_margin and refresh
+    # set the ranges start on refresh frames, where the whole video gets a full
+    # search as well, so both are tracked the same.
+    align = refresh if window_margin is not None and refresh else 1
+    all_keypoints = []
+    for chunk_keypoints in map_chunks(track_chunk, video_file, n_chunks, processes,
+                                      (n_workers, window_margin, refresh, cleanup), align):
+        all_keypoints += chunk_keypoints
+    return all_keypoints
+
+
+def save_keypoints(path, all_keypoints):
+    # Save the keypoints of all frames as x,y lines in frame order. The file is
+    # written under a temporary name first, so an existing file is always complete.
+    points = [point for frame_points in all_keypoints for point in frame_points]
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savetxt(f, np.array(points).reshape((-1, 2)), delimiter=',')
+    os.rename(tmp_path, path)
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('video_file')
+    parser.add_argument('-j', '--workers', type=int, default=4,
+                        help='number of detection threads')
+    parser.add_argument('--headless', action='store_true',
+                        help='do not show the frames or the plot')
+    parser.add_argument('-o', '--output', default='path.positions',
+                        help='file to save the keypoints to')
+    parser.add_argument('-c', '--chunks', type=int, default=1,
+                        help='split the video into this many frame ranges tracked in parallel processes, '
+                             'implies --headless while tracking')
+    parser.add_argument('-t', '--track', action='store_true',
+                        help='only search a window around where the blobs are predicted to be, '
+                             'on a single detection thread')
+    parser.add_argument('--margin', type=int, default=60,
+                        help='pixels the --track window extends past the predicted blobs')
+    parser.add_argument('--refresh', type=int, default=0,
+                        help='with --track, search the full frame on every frame numbered a multiple of this, '
+                             '0 for never')
+    parser.add_argument('--cleanup', choices=CLEANUP_METHODS, default='close',
+                        help='how to clean up the color mask before finding blobs')
+    parser.add_argument('--scale', type=int, default=2,
+                        help='how much the downscale and components cleanups shrink the mask')
+    args = parser.parse_args()
+
+    cleanup = MaskCleanup(args.cleanup, args.scale)
+    t_start = time.time()
+    tracker = None
+    if args.chunks > 1:
+        all_keypoints = track_video_chunked(args.video_file, args.chunks, args.workers,
+                                            window_margin=args.margin if args.track else None,
+                                            refresh=args.refresh, cleanup=cleanup)
+    else:
+        if args.track:
+            tracker = BlobTracker(create_detector(), args.margin, args.refresh, cleanup)
+        all_keypoints = track_video(args.video_file, args.workers, args.headless, tracker=tracker,
+                                    cleanup=cleanup)
+    elapsed = time.time() - t_start
+
+    cap = cv2.VideoCapture(args.video_file)
+    video_fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    fps = len(all_keypoints) / max(elapsed, 1e-9)
+    print("%d frames in %.2f s, %.1f frames/s" % (len(all_keypoints), elapsed, fps))
+    if video_fps > 0:
+        print("%.1fx real time" % (fps / video_fps))
+    if tracker is not None:
+        print("%d frames searched in a window, %d in full" % (tracker.window_frames, tracker.full_frames))
 
     # Save keypoints.
-    np.savetxt('path.positions', np.transpose([all_keypoints_x, all_keypoints_y]), delimiter=',')
+    save_keypoints(args.output, all_keypoints)
 
-    # Plot keypoints.
-    plt.scatter(np.asarray(all_keypoints_x), np.asarray(all_keypoints_y), color='b')
-    plt.show()
+    if not args.headless:
+        # Plot keypoints.
+        points = np.array([point for frame_points in all_keypoints for point in frame_points]).reshape((-1, 2))
+        plt.scatter(points[:, 0], points[:, 1], color='b')
+        plt.show()
 
 if __name__ == '__main__':
     main()
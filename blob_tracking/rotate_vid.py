@@ -27,7 +27,19 @@
 import argparse
 import cv2
 from threading import Thread
+import os
 import sys
+from video_chunks import concatenate_videos
+from video_chunks import map_chunks
+from video_chunks import open_video_at
+from video_chunks import read_frames
+from video_chunks import segment_file
+
+# Python 2's input evaluates what is typed, raw_input is the one that reads it.
+try:
+    input = raw_input
+except NameError:
+    pass
 
 
 class DisplayImageThread (Thread):
@@ -70,7 +82,7 @@ def ask_user_about_angle(angle):
 
     while True:
         # Get choice.
-        choice = raw_input(prompt).lower()
+        choice = input(prompt).lower()
 
         # Check to see if the choice is a number.
         try:
@@ -124,6 +136,25 @@ def prompt_and_rotate(filename, angle):
     return rotation_good, angle
 
 
+def rotate_range(in_file, start_frame, end_frame, n_chunk, angle, out_file):
+    # Rotate the frames from start_frame up to end_frame into a segment of
+    # out_file, for map_chunks. Returns the name of the segment.
+    cap = open_video_at(in_file, start_frame)
+    # Create the writer.
+    fourcc = cv2.VideoWriter_fourcc(*'XVID')
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    part_file = segment_file(out_file, n_chunk)
+    out = cv2.VideoWriter(part_file, fourcc, int(cap.get(cv2.CAP_PROP_FPS)), (width, height))
+
+    for frame in read_frames(cap, start_frame, end_frame):
+        out.write(rotate_frame(frame, angle))
+
+    cap.release()
+    out.release()
+    return part_file
+
+
 def main():
     # Get command line args.
     parser = argparse.ArgumentParser()
@@ -133,6 +164,8 @@ def main():
                         help='angle in degrees to rotate the video')
     parser.add_argument('-y', action='store_true',
                         help='check angle by displaying sample image')
+    parser.add_argument('-c', '--chunks', type=int, default=1,
+                        help='split the video into this many frame ranges done in parallel processes')
     args = parser.parse_args()
 
     # Store and check angle is valid.
@@ -147,7 +180,13 @@ def main():
         angle_good, angle = prompt_and_rotate(args.in_file, angle)
 
     # Check to see if the user was happy with the rotation.
-    if angle_good:
+    if angle_good and args.chunks > 1:
+        # Rotate frame ranges in parallel, then join the segments.
+        segments = map_chunks(rotate_range, args.in_file, args.chunks, extra_args=(angle, 'out.avi'))
+        concatenate_videos(segments, 'out.avi')
+        for part_file in segments:
+            os.remove(part_file)
+    elif angle_good:
         # Get video file.
         cap = cv2.VideoCapture(args.in_file)
         # Create the writer.
@@ -179,12 +218,14 @@ def main():
             sys.stdout.flush()
 
         # Newline for command prompt.
-        print '\n'
+        print('\n')
         cap.release()
         out.release()
 
-    # Clean up.
-    cv2.destroyAllWindows()
+    # Clean up. Only the -y sample opens windows, and OpenCV builds without a
+    # GUI can't destroy them.
+    if args.y:
+        cv2.destroyAllWindows()
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+## @file find_blob_vid.py Script for finding the Nao robot's orange colors in video.
+## @file test_find_nao_vid.py Tests for the Nao video tracker, run with pytest.
+
+import cv2
+import numpy as np
+import pytest
+from threading import Thread
+from find_nao_vid import BlobTracker
+from find_nao_vid import create_detector
+from find_nao_vid import track_video
+from find_nao_vid import track_video_chunked
+
+# Seconds a tracking run may take before it counts as hung.
+TIMEOUT = 30
+
+
+def write_video(path, n_frames=40, size=(320, 240), appear=None):
+    # Video of an orange disc moving to the right across a gray background. A
+    # second disc shows up in the bottom right corner from frame appear on.
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10, size)
+    for n_frame in range(n_frames):
+        frame = np.full((size[1], size[0], 3), 90, np.uint8)
+        cv2.circle(frame, (20 + 3 * n_frame, 25), 12, (0, 128, 255), -1)
+        if appear is not None and n_frame >= appear:
+            cv2.circle(frame, (size[0] - 25, size[1] - 25), 12, (0, 128, 255), -1)
+        out.write(frame)
+    out.release()
+    return path
+
+
+def run_with_timeout(func, *args, **kwargs):
+    # Result or exception of func, failing the test if it doesn't return in time.
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = func(*args, **kwargs)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = Thread(target=target)
+    thread.daemon = True
+    thread.start()
+    thread.join(TIMEOUT)
+    assert not thread.is_alive(), "tracking hung"
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['result']
+
+
+class FailingCleanup:
+    def detect(self, mask, detector):
+        raise RuntimeError("detection failed")
+
+
+def test_detection_error_is_raised(tmp_path):
+    video_file = write_video(str(tmp_path / 'disc.avi'))
+    for n_workers in (1, 3):
+        with pytest.raises(RuntimeError, match="detection failed"):
+            run_with_timeout(track_video, video_file, n_workers, headless=True, queue_size=2,
+                             cleanup=FailingCleanup())
+
+
+def test_tracks_every_frame(tmp_path):
+    video_file = write_video(str(tmp_path / 'disc.avi'))
+    all_keypoints = run_with_timeout(track_video, video_file, 3, headless=True)
+    assert len(all_keypoints) == 40
+    assert all(len(points) == 1 for points in all_keypoints)
+
+
+def test_chunks_refresh_like_the_whole_video(tmp_path):
+    video_file = write_video(str(tmp_path / 'discs.avi'), appear=13)
+    tracker = BlobTracker(create_detector(), refresh=5)
+    whole = run_with_timeout(track_video, video_file, 1, headless=True, tracker=tracker)
+    chunked = run_with_timeout(track_video_chunked, video_file, 3, window_margin=60, refresh=5)
+    # The second disc is outside the window, so it is only found by the refresh
+    # on frame 15.
+    assert [len(points) for points in whole] == [1] * 15 + [2] * 25
+    assert [len(points) for points in chunked] == [len(points) for points in whole]
+    # Window keypoints are moved back to frame coordinates in float32.
+    assert np.allclose(np.concatenate(chunked), np.concatenate(whole), atol=1e-3)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+## @file video_chunks.py Module for processing frame ranges of one video in parallel.
+
+
+import cv2
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+
+
+def frame_count(video_file):
+    # Number of frames the container claims to have.
+    cap = cv2.VideoCapture(video_file)
+    n_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return n_frames
+
+
+def frame_ranges(n_frames, n_chunks, align=1):
+    # Split frames [0, n_frames) into n_chunks (start, end) ranges of nearly
+    # equal length, each starting on a multiple of align. The last range is open
+    # ended (end is None) so frames the container didn't count are still read.
+    n_chunks = max(1, min(n_chunks, n_frames))
+    align = max(1, int(align))
+    bounds = sorted(set([n_frames * i // n_chunks // align * align for i in range(n_chunks)] + [n_frames]))
+    ranges = list(zip(bounds[:-1], bounds[1:])) or [(0, 0)]
+    ranges[-1] = (ranges[-1][0], None)
+    return ranges
+
+
+def open_video_at(video_file, start_frame):
+    # Capture positioned on start_frame.
+    cap = cv2.VideoCapture(video_file)
+    if start_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+    return cap
+
+
+def read_frames(cap, start_frame, end_frame):
+    # Frames of an opened capture from start_frame up to, not including,
+    # end_frame, or to the end of the video if end_frame is None.
+    n_frame = start_frame
+    while cap.isOpened() and (end_frame is None or n_frame < end_frame):
+        # Read video frame
+        ret, frame = cap.read()
+
+        # Check to see if frame is valid
+        if not ret:
+            break
+
+        yield frame
+        n_frame += 1
+
+
+def _call(job):
+    func, args = job
+    return func(*args)
+
+
+def map_chunks(func, video_file, n_chunks, processes=None, extra_args=(), align=1):
+    # Call func(video_file, start_frame, end_frame, chunk number, *extra_args)
+    # for each frame range of the video in a process pool, see frame_ranges for
+    # align. Returns the results in frame order. func must be a module level
+    # function so it can be pickled.
+    ranges = frame_ranges(frame_count(video_file), n_chunks, align)
+    jobs = [(func, (video_file, start, end, n) + tuple(extra_args)) for n, (start, end) in enumerate(ranges)]
+    pool = multiprocessing.Pool(processes or len(jobs))
+    try:
+        return pool.map(_call, jobs, 1)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def concatenate_videos(segment_files, out_file, fourcc_code='XVID'):
+    # Join video segments into one file. ffmpeg's concat demuxer copies the
+    # streams without decoding when it is installed, otherwise the frames are
+    # decoded and encoded again with OpenCV.
+    list_fd, list_path = tempfile.mkstemp(suffix='.txt')
+    with os.fdopen(list_fd, 'w') as f:
+        for segment_file in segment_files:
+            f.write("file '%s'\n" % os.path.abspath(segment_file).replace("'", "'\\''"))
+    try:
+        with open(os.devnull, 'w') as devnull:
+            returncode = subprocess.call(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                                          '-i', list_path, '-c', 'copy', out_file],
+                                         stdout=devnull, stderr=devnull)
+        if returncode == 0:
+            return
+    except OSError:
+        # No ffmpeg.
+        pass
+    finally:
+        os.remove(list_path)
+
+    if len(segment_files) == 1:
+        shutil.copyfile(segment_files[0], out_file)
+        return
+
+    out = None
+    for segment_file in segment_files:
+        cap = cv2.VideoCapture(segment_file)
+        if out is None:
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            fourcc = cv2.VideoWriter_fourcc(*fourcc_code)
+            out = cv2.VideoWriter(out_file, fourcc, int(cap.get(cv2.CAP_PROP_FPS)), (width, height))
+        for frame in read_frames(cap, 0, None):
+            out.write(frame)
+        cap.release()
+    if out is not None:
+        out.release()
+
+
+def segment_file(out_file, n_chunk):
+    # Name of the segment a chunk writes before the segments are joined.
+    base, ext = os.path.splitext(out_file)
+    return '%s.part%03d%s' % (base, n_chunk, ext)
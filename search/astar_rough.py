@@ -24,22 +24,53 @@
 
 ## @file astar_rough.py Module for doing an astar search.
 
-from copy import deepcopy
+from array import array
+from heapq import heappop
+from heapq import heappush
+from itertools import count
+import math
+import numpy as np
 from numpy import linalg as la
+import time
+from bidirectional import findBidirectionalPath
+from jump_point import findJumpPointPath
 from nodes import Node
+from path_io import savePaths
+from search_stats import SearchStats
+from smoothing import smoothPath
 # from node_maps import createMap1
-from node_maps import createMapFromImage
+from node_maps import createPaddedGrid
+from node_maps import loadCachedGraph
+from node_maps import paddedGridSteps
 from view_map import printMap
-from view_map import viewMap
+from view_map import viewTrace
+
+# Search modes, see Searcher.set_mode.
+MODE_ASTAR = 'astar'
+MODE_JPS = 'jps'
+MODE_BIDIRECTIONAL = 'bidirectional'
+
+# Rows of the landmark heuristic filled in at a time, see Searcher._landmark_heuristic.
+LANDMARK_BAND_ROWS = 8
 
 
 class AStarNode(Node):
     def __init__(self, node):
+        # Equality and hashing defer to the map node being wrapped, so compact
+        # node types keep their cheap comparisons inside the searcher.
+        self._node = getattr(node, '_node', node)
         self._state = node.get_state()
         self._neighbors = node.get_neighbors()
+        self._predecessor = None
         self._fscore = float("inf")
         self._gscore = float("inf")
 
+    def __eq__(self, node):
+        return self._node == getattr(node, '_node', node)
+
+    def __hash__(self):
+        return hash(self._node)
+
     def set_fscore(self, score):
         self._fscore = score
 
@@ -57,17 +88,122 @@ class AStarNode(Node):
 
 
 class Searcher:
-    def __init__(self):
+    def __init__(self, trace=False, stats=False):
+        # Open set is a binary heap of (fscore, insertion order, node) entries.
+        # Entries that have been superseded by a cheaper route are left in place
+        # and skipped when popped.
         self._open = []
-        self._closed = []
+        self._closed = set()
+        # Best open node and first insertion order per state.
+        self._best = {}
+        self._order = {}
+        self._counter = count()
+        # The map is shared and never modified by the search.
         self._map = []
+        # Expansion history as flat (row, col, fscore) triples, only kept when
+        # tracing is on since it is only needed to visualize the search.
+        self._trace = array('d') if trace else None
+        # Counters and timings of the last search, only kept when asked for since
+        # the timing calls slow the search down.
+        self._stats = SearchStats() if stats else None
+        self._push = heappush
         self._start_state = AStarNode(Node([float("inf"), float("inf")]))
         self._goal_state = AStarNode(Node([float("inf"), float("inf")]))
         # self._path_length = float("inf")
         self._path = []
+        # Occupancy grid searched directly when set, see add_grid.
+        self._grid = None
+        self._grid_cols = 0
+        self._grid_steps = []
+        # Landmark tables for the grid heuristic, see add_landmarks, and the
+        # heuristic table of the last goal they were used for.
+        self._landmarks = None
+        self._landmark_cache = None
+        # Cost of moving through each padded grid cell, see add_cost_map, and the
+        # lowest of them to scale the heuristic by.
+        self._cell_costs = None
+        self._cost_scale = 1.0
+        self._mode = MODE_ASTAR
+        self._threaded = False
+        self._expansions = 0
+        self._direction_stats = None
 
     def add_map(self, map):
-        self._map = deepcopy(map)
+        self._map = map
+
+    def add_grid(self, arr_map, connectivity=4):
+        # Search the occupancy array directly instead of a node graph, see
+        # createPaddedGrid for the cell indexing.
+        self._grid, self._grid_cols, self._grid_steps = createPaddedGrid(arr_map, connectivity)
+        self._cell_costs = None
+        self._landmark_cache = None
+
+    def add_padded_grid(self, free, cols, steps):
+        # Search a grid already laid out by createPaddedGrid, e.g. one that lives
+        # in shared memory. The grid is only read.
+        self._grid, self._grid_cols, self._grid_steps = free, cols, steps
+        self._cell_costs = None
+        self._landmark_cache = None
+
+    def add_graph_file(self, graph):
+        # Search the padded grid of a graph file from loadGraphFile in place.
+        cols = graph['cols'] + 2
+        self.add_padded_grid(graph['free'], cols, paddedGridSteps(cols, graph['connectivity']))
+
+    def add_cost_map(self, costs, connectivity=4):
+        # Search a cost map like the ones from cost_maps.loadCostMap. A step costs
+        # its length times the mean cost of the two cells and cells of inf cost
+        # are obstacles. Only MODE_ASTAR searches can use costs.
+        costs = np.asarray(costs, dtype=float)
+        self.add_grid(np.isfinite(costs), connectivity)
+        self._cell_costs = np.full(len(self._grid), float("inf"))
+        self._cell_costs.reshape((-1, self._grid_cols))[1:-1, 1:-1] = costs
+        finite = costs[np.isfinite(costs)]
+        self._cost_scale = float(finite.min()) if len(finite) else 1.0
+
+    def add_landmarks(self, landmarks):
+        # Use landmark lower bounds from landmarks.buildLandmarks as well as the
+        # straight line distance in the heuristic of MODE_ASTAR grid searches.
+        # They must have been built from the free cells and connectivity of the
+        # grid, see Landmarks.check_grid.
+        free = np.asarray(self._grid).reshape((-1, self._grid_cols))[1:-1, 1:-1]
+        landmarks.check_grid(free, len(self._grid_steps))
+        self._landmarks = landmarks
+        self._landmark_cache = None
+
+    def set_mode(self, mode):
+        # MODE_ASTAR expands every cell it reaches. MODE_JPS only expands jump
+        # points, which needs a uniform cost grid from add_grid.
+        # MODE_BIDIRECTIONAL searches from both ends of a grid at once.
+        if mode not in (MODE_ASTAR, MODE_JPS, MODE_BIDIRECTIONAL):
+            raise ValueError("unknown search mode " + str(mode))
+        self._mode = mode
+
+    def set_threaded(self, threaded):
+        # Run the two directions of MODE_BIDIRECTIONAL on their own threads.
+        self._threaded = threaded
+
+    def get_direction_stats(self):
+        # Expansions and seconds per direction of the last MODE_BIDIRECTIONAL
+        # search, as {'forward': {...}, 'backward': {...}}.
+        return self._direction_stats
+
+    def expansion_count(self):
+        # Nodes expanded by the last find_path.
+        return self._expansions
+
+    def get_stats(self):
+        # SearchStats of the last search, or None if stats are off. Only the
+        # expansions and total time are filled in for MODE_JPS and
+        # MODE_BIDIRECTIONAL.
+        return self._stats
+
+    def _to_index(self, state):
+        return (int(state[0]) + 1) * self._grid_cols + int(state[1]) + 1
+
+    def _to_state(self, idx):
+        row, col = divmod(idx, self._grid_cols)
+        return [row - 1, col - 1]
 
     def set_start(self, node):
         self._start_state = AStarNode(node)
@@ -82,6 +218,401 @@ class Searcher:
     def cost_to_node(self, node1, node2):
         return la.norm(node1.get_state() - node2.get_state())
 
+    def in_closed_set(self, node):
+        return node in self._closed
+
+    def in_open_set(self, node):
+        return node in self._best and node not in self._closed
+
+    def path_length(self):
+        return len(self._path)
+
+    def get_trace(self):
+        # Expanded states in expansion order as rows of (row, col, fscore), or
+        # None if tracing is off.
+        if self._trace is None:
+            return None
+        return np.frombuffer(self._trace, dtype=np.float64).reshape((-1, 3)).copy()
+
+    def _record_expansion(self, state, fscore):
+        self._trace.extend((state[0], state[1], fscore))
+
+    def get_path_states(self):
+        # States from start to goal as rows of an array.
+        if not self._path:
+            return np.zeros((0, 2), dtype=np.int64)
+        return np.array([node.get_state() for node in reversed(self._path)], dtype=np.int64)
+
+    def save_path(self, path_file, smoothed=False):
+        # Write the path as x,y = col,row lines that blob_tracking's draw_path
+        # scripts can load, or in any other format of path_io by extension.
+        states = self.get_smoothed_path_states() if smoothed else self.get_path_states()
+        savePaths(path_file, [states])
+
+    def get_smoothed_path_states(self):
+        # Any-angle version of the path from get_path_states, keeping only the
+        # waypoints needed to go between them in straight lines over free cells.
+        # Needs the occupancy grid from add_grid. Lines of sight only look at
+        # whether cells are free, so a shortcut over a cost map could cross cells
+        # the search went around, and its paths are returned as they are.
+        if self._grid is None:
+            raise ValueError("path smoothing needs a grid from add_grid")
+        if self._cell_costs is not None:
+            return self.get_path_states()
+        free = np.asarray(self._grid).reshape((-1, self._grid_cols))
+        # The padded grid has a border of obstacles, so states shift by one.
+        return smoothPath(free, self.get_path_states() + 1) - 1
+
+    def _generate_path(self):
+        c_node = self._goal_state
+        self._path.append(c_node)
+        while not c_node == self._start_state:
+            c_node = c_node.get_predecessor()
+            self._path.append(c_node)
+
+    def _reset_search(self):
+        # Forget the sets, path and counters of the last search, so a Searcher
+        # can answer several queries and a failed one reports no path.
+        self._open = []
+        self._closed = set()
+        self._best = {}
+        self._order = {}
+        self._counter = count()
+        self._path = []
+        if self._trace is not None:
+            self._trace = array('d')
+        self._expansions = 0
+        self._direction_stats = None
+
+    def _push_open(self, node):
+        # Ties are broken by when the state first entered the open set.
+        if node not in self._order:
+            self._order[node] = next(self._counter)
+        self._best[node] = node
+        self._push(self._open, (node.get_fscore(), self._order[node], node))
+
+    def _generate_grid_path(self, indices):
+        # Build the path from the cells between start and goal. Only the nodes on
+        # the path are materialized.
+        p_node = None
+        p_state = None
+        p_idx = None
+        gscore = 0.0
+        for idx in indices:
+            state = self._to_state(idx)
+            if p_state is not None:
+                step = math.sqrt((state[0] - p_state[0]) ** 2 + (state[1] - p_state[1]) ** 2)
+                if self._cell_costs is not None:
+                    step *= 0.5 * (self._cell_costs[p_idx] + self._cell_costs[idx])
+                gscore += step
+            a_node = AStarNode(Node(state))
+            a_node.set_gscore(gscore)
+            a_node.set_fscore(gscore)
+            a_node.set_predecessor(p_node)
+            self._path.append(a_node)
+            p_node = a_node
+            p_state = state
+            p_idx = idx
+        self._path.reverse()
+        self._start_state = self._path[-1]
+        self._goal_state = self._path[0]
+
+    def _grid_search(self, start_idx, goal_idx=None):
+        # Search the grid from start_idx, stopping once goal_idx is expanded. With
+        # no goal there is no heuristic and every reachable cell gets expanded.
+        free = self._grid
+        cols = self._grid_cols
+        steps = self._grid_steps
+        trace = self._trace
+        cell_costs = self._cell_costs
+
+        # Per cell search state, preallocated for the whole grid.
+        gscores = np.full(len(free), float("inf"))
+        parents = np.full(len(free), -1, dtype=np.int32)
+        closed = np.zeros(len(free), dtype=bool)
+        # First insertion order, used to break ties like the node search does.
+        order = np.full(len(free), -1, dtype=np.int32)
+
+        if goal_idx is None:
+            def cost_to_goal(idx):
+                return 0.0
+        elif self._landmarks is not None and self._landmarks.landmark_count():
+            # The table is nan until the band of rows around a cell is first reached.
+            heuristic, fill_band = self._landmark_heuristic(goal_idx)
+            band_cells = LANDMARK_BAND_ROWS * cols
+
+            def cost_to_goal(idx):
+                h = heuristic[idx]
+                if h != h:
+                    fill_band(idx // band_cells)
+                    h = heuristic[idx]
+                return h
+        elif cell_costs is not None:
+            # No cell costs less than the cheapest one.
+            goal_row, goal_col = divmod(goal_idx, cols)
+            scale = self._cost_scale
+
+            def cost_to_goal(idx):
+                row, col = divmod(idx, cols)
+                return scale * math.sqrt((row - goal_row) ** 2 + (col - goal_col) ** 2)
+        else:
+            goal_row, goal_col = divmod(goal_idx, cols)
+
+            def cost_to_goal(idx):
+                row, col = divmod(idx, cols)
+                return math.sqrt((row - goal_row) ** 2 + (col - goal_col) ** 2)
+
+        push = heappush
+        pop = heappop
+        stats = self._stats
+        if stats is not None:
+            push = stats.timed_push(push)
+            pop = stats.timed_pop(pop)
+            cost_to_goal = stats.timed_heuristic(cost_to_goal)
+
+        if not free[start_idx]:
+            return gscores, parents, False
+
+        gscores[start_idx] = 0.0
+        order[start_idx] = 0
+        open_set = [(cost_to_goal(start_idx), 0, start_idx)]
+        counter = count(1)
+
+        while open_set:
+            c_fscore, _, c_idx = pop(open_set)
+
+            # Skip stale entries for cells that were reached more cheaply.
+            if closed[c_idx]:
+                continue
+            if trace is not None:
+                self._record_expansion(self._to_state(c_idx), c_fscore)
+
+            if c_idx == goal_idx:
+                self._expansions = int(np.count_nonzero(closed)) + 1
+                if stats is not None:
+                    stats.count_states(int(np.count_nonzero(order >= 0)) - 1)
+                return gscores, parents, True
+
+            closed[c_idx] = True
+            c_gscore = gscores[c_idx]
+
+            for step, row_step, col_step, cost in steps:
+                n_idx = c_idx + step
+                if not free[n_idx] or closed[n_idx]:
+                    continue
+                if row_step and col_step and not (free[c_idx + row_step] and free[c_idx + col_step]):
+                    continue
+
+                if cell_costs is None:
+                    n_gscore = c_gscore + cost
+                else:
+                    n_gscore = c_gscore + cost * 0.5 * (cell_costs[c_idx] + cell_costs[n_idx])
+                if n_gscore > gscores[n_idx]:
+                    continue
+                parents[n_idx] = c_idx
+                if n_gscore == gscores[n_idx]:
+                    # Same cost, so only the predecessor changes.
+                    continue
+
+                gscores[n_idx] = n_gscore
+                if order[n_idx] < 0:
+                    order[n_idx] = next(counter)
+                push(open_set, (n_gscore + cost_to_goal(n_idx), order[n_idx], n_idx))
+
+        self._expansions = int(np.count_nonzero(closed))
+        if stats is not None:
+            stats.count_states(int(np.count_nonzero(order >= 0)) - 1)
+        return gscores, parents, False
+
+    def _find_grid_path(self):
+        start_idx = self._to_index(self._start_state.get_state())
+        goal_idx = self._to_index(self._goal_state.get_state())
+        if not self._grid[goal_idx]:
+            self._expansions = 0
+            return False
+
+        record = None
+        if self._trace is not None:
+            def record(idx, fscore):
+                self._record_expansion(self._to_state(idx), fscore)
+
+        if self._cell_costs is not None and self._mode != MODE_ASTAR:
+            raise ValueError("search mode " + self._mode + " does not support cost maps")
+
+        if self._mode == MODE_JPS:
+            indices, self._expansions = findJumpPointPath(self._grid, self._grid_cols, len(self._grid_steps),
+                                                          start_idx, goal_idx, record)
+            if indices:
+                self._generate_grid_path(indices)
+            return bool(indices)
+
+        if self._mode == MODE_BIDIRECTIONAL:
+            indices, self._direction_stats = findBidirectionalPath(self._grid, self._grid_cols, self._grid_steps,
+                                                                   start_idx, goal_idx, self._threaded, record)
+            self._expansions = sum(stats['expansions'] for stats in self._direction_stats.values())
+            if indices:
+                self._generate_grid_path(indices)
+            return bool(indices)
+
+        gscores, parents, found = self._grid_search(start_idx, goal_idx)
+        if found:
+            indices = [goal_idx]
+            while parents[indices[-1]] >= 0:
+                indices.append(parents[indices[-1]])
+            self._generate_grid_path(indices[::-1])
+        return found
+
+    def _landmark_heuristic(self, goal_idx):
+        # Table of the larger of the landmark bound max |d(L, cell) - d(L, goal)|
+        # and the straight line distance for the padded grid, and a function that
+        # fills in a band of LANDMARK_BAND_ROWS rows of it. Bands are only filled
+        # once a search reaches them, and the table is kept for the next search
+        # to the same goal.
+        scale = self._cost_scale if self._cell_costs is not None else 1.0
+        cache = self._landmark_cache
+        if cache is None or cache[0] != (goal_idx, scale):
+            cache = ((goal_idx, scale), np.full(len(self._grid), float("nan")))
+            self._landmark_cache = cache
+        heuristic = cache[1]
+
+        cols = self._grid_cols
+        rows = len(self._grid) // cols
+        goal_row, goal_col = divmod(goal_idx, cols)
+        goal_state = [goal_row - 1, goal_col - 1]
+
+        def fill_band(band):
+            row_start = band * LANDMARK_BAND_ROWS
+            row_end = min(rows, row_start + LANDMARK_BAND_ROWS)
+            table = np.hypot(np.arange(row_start, row_end)[:, np.newaxis] - goal_row,
+                             np.arange(cols)[np.newaxis, :] - goal_col)
+            # The padding rows and cols have no landmark costs.
+            map_start = max(row_start, 1)
+            map_end = min(row_end, rows - 1)
+            if map_start < map_end:
+                bounds = self._landmarks.lower_bounds(goal_state, map_start - 1, map_end - 1)
+                np.maximum(table[map_start - row_start:map_end - row_start, 1:-1], bounds,
+                           out=table[map_start - row_start:map_end - row_start, 1:-1])
+            heuristic[row_start * cols:row_end * cols] = scale * table.ravel()
+
+        return heuristic, fill_band
+
+    def find_distance_field(self, node):
+        # Costs from the node to every cell of the grid, and the predecessor of
+        # each cell on its cheapest route back to the node. Both are the shape of
+        # the map. Predecessors are flat indices into the map, -1 where there is
+        # none. Unreachable cells cost inf.
+        if self._stats is not None:
+            self._stats.start('distance field')
+        gscores, parents, _ = self._grid_search(self._to_index(node.get_state()))
+        if self._stats is not None:
+            self._stats.stop(self._expansions, False)
+
+        rows, cols = divmod(parents, self._grid_cols)
+        map_cols = self._grid_cols - 2
+        predecessors = np.where(parents >= 0, (rows - 1) * map_cols + cols - 1, -1).astype(np.int32)
+
+        shape = (-1, self._grid_cols)
+        return (np.ascontiguousarray(gscores.reshape(shape)[1:-1, 1:-1]),
+                np.ascontiguousarray(predecessors.reshape(shape)[1:-1, 1:-1]))
+
+    def find_path(self):
+        # Returns whether a path was found.
+        self._reset_search()
+        if self._stats is None:
+            return self._find_path()
+        self._stats.start(self._mode)
+        found = False
+        try:
+            found = self._find_path()
+        finally:
+            self._stats.stop(self._expansions, found)
+        return found
+
+    def _find_path(self):
+        if self._grid is not None:
+            return self._find_grid_path()
+        if self._mode != MODE_ASTAR:
+            raise ValueError("search mode " + self._mode + " needs a grid from add_grid")
+
+        pop = heappop
+        cost_to_goal = self.cost_to_goal
+        if self._stats is not None:
+            self._push = self._stats.timed_push(heappush)
+            pop = self._stats.timed_pop(pop)
+            cost_to_goal = self._stats.timed_heuristic(cost_to_goal)
+
+        # Add start to open set.
+        start_node = AStarNode(self._start_state)
+        start_node.set_gscore(0)
+        start_node.set_fscore(cost_to_goal(self._start_state))
+        self._push_open(start_node)
+
+        # If open list isn't empty.
+        while self._open:
+            # Expand the cheapest node.
+            c_node = pop(self._open)[2]
+
+            # Skip stale entries for nodes that were reached more cheaply.
+            if c_node in self._closed:
+                continue
+            if self._trace is not None:
+                self._record_expansion(c_node.get_state(), c_node.get_fscore())
+
+            # Is this the goal?
+            if c_node == self._goal_state:
+                # Reconstruct the path.
+                self._goal_state = c_node
+                self._generate_path()
+                self._expansions = len(self._closed) + 1
+                if self._stats is not None:
+                    self._stats.count_states(len(self._order))
+                return True
+
+            # Add it to the closed set.
+            self._closed.add(c_node)
+
+            # Check to see if neighbors need to be expanded or cost updated.
+            c_neighbors = c_node.get_neighbors()
+
+            for n_node in c_neighbors:
+                # If it's closed it doesn't need to be checked.
+                if n_node in self._closed:
+                    continue
+
+                # Only keep the route if it is at least as cheap as the best known one.
+                n_gscore = c_node.get_gscore() + self.cost_to_node(c_node, n_node)
+                b_node = self._best.get(n_node)
+                if b_node is not None:
+                    if n_gscore > b_node.get_gscore():
+                        continue
+                    if n_gscore == b_node.get_gscore():
+                        # Same cost, so only the predecessor changes.
+                        b_node.set_predecessor(c_node)
+                        continue
+
+                # Update cost and add to open.
+                an_node = AStarNode(n_node)
+                an_node.set_gscore(n_gscore)
+                an_node.set_fscore(n_gscore + cost_to_goal(an_node))
+                an_node.set_predecessor(c_node)
+                self._push_open(an_node)
+
+        self._expansions = len(self._closed)
+        if self._stats is not None:
+            self._stats.count_states(len(self._order))
+        return False
+
+
+# Original list-based searcher, kept as a reference for benchmarking.
+class ListSearcher(Searcher):
+    def __init__(self, trace=False):
+        Searcher.__init__(self, trace)
+        self._closed = []
+
+    def _reset_search(self):
+        Searcher._reset_search(self)
+        self._closed = []
+
     def in_closed_set(self, node):
         # return any((node == c_node).all() for c_node in self._closed)
         try:
@@ -98,17 +629,9 @@ class Searcher:
         except Exception:
             return False
 
-    def path_length(self):
-        return len(self._path)
-
-    def _generate_path(self):
-        c_node = self._goal_state
-        self._path.append(c_node)
-        while not c_node == self._start_state:
-            c_node = c_node.get_predecessor()
-            self._path.append(c_node)
-
     def find_path(self):
+        self._reset_search()
+
         # Add start to open set.
         start_node = AStarNode(self._start_state)
         start_node.set_gscore(0)
@@ -122,14 +645,16 @@ class Searcher:
 
             # Expand node.
             c_node = self._open.pop(0)
-            self._map.append(c_node)
+            if self._trace is not None:
+                self._record_expansion(c_node.get_state(), c_node.get_fscore())
 
             # Is this the goal?
             if c_node == self._goal_state:
                 # Reconstruct the path.
                 self._goal_state = c_node
                 self._generate_path()
-                return
+                self._expansions = len(self._closed) + 1
+                return True
 
             # Add it to the closed set.
             self._closed.append(c_node)
@@ -151,43 +676,38 @@ class Searcher:
                 if not self.in_open_set(an_node):
                     self._open.append(an_node)
                 else:
-                    # Find the node in the open set.
-                    # bn_node = [node for node in self._open if node == an_node]
-                    # if bn_node[0].get_gscore() >= an_node.get_gscore():
-                    #     bn_node[0] = an_node
                     b_ndx = self._open.index(an_node)
                     if self._open[b_ndx].get_gscore() >= an_node.get_gscore():
                         self._open[b_ndx] = an_node
 
+        self._expansions = len(self._closed)
+        return False
+
 
 def main():
+    t_start = time.time()
 
-    # Get a map.
+    # Get a map. The graph file is cached next to the image, so only the first
+    # run has to decode the image and build it.
     # map = createMap1()
-    map = createMapFromImage('Simple_maze_small1.png')
-
-    # TODO: Convert to coordinates.
-    # n_s = [node for node in map if node == Node([0, 0])]
-    # n_s = n_s[0]
-    # n_f = [node for node in map if node == Node([1, 4])]
-    # n_f = n_f[0]
-    n_s = [node for node in map if node == Node([85, 5])]
-    n_s = n_s[0]
-    n_f = [node for node in map if node == Node([38, 42])]
-    n_f = n_f[0]
+    graph = loadCachedGraph('Simple_maze_small1.png')
 
+    n_s = Node([85, 5])
+    n_f = Node([38, 42])
     print("Start Node: " + str(n_s.get_state()))
 
     # Find path.
-    s = Searcher()
-    # s.add_map(map)
+    s = Searcher(trace=True, stats=True)
+    s.add_graph_file(graph)
     s.set_start(n_s)
     s.set_goal(n_f)
     s.find_path()
 
-    print s.path_length()
+    print(s.path_length())
+    print("Time to first path: %.4f s" % (time.time() - t_start))
+    print(s.get_stats().to_json())
     # printMap(s._path)
-    viewMap(s._map, path=s._path)
+    viewTrace(s.get_trace(), path=s._path)
 
 if __name__ == '__main__':
     main()
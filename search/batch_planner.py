@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file batch_planner.py Module for planning many paths on one map with a process pool.
+
+import argparse
+import multiprocessing
+import numpy as np
+import time
+from astar_rough import Searcher
+from node_maps import createPaddedGrid
+from node_maps import loadOccupancyArray
+from nodes import Node
+from path_io import savePaths
+
+# Grid shared by the workers of a pool, set up by _initWorker.
+_worker_searcher_grid = None
+
+
+def _initWorker(shared_free, cols, steps):
+    # The padded grid is inherited as shared memory rather than pickled per task.
+    global _worker_searcher_grid
+    _worker_searcher_grid = (np.frombuffer(shared_free, dtype=np.bool_), cols, steps)
+
+
+def _planPair(pair):
+    s = Searcher()
+    s.add_padded_grid(*_worker_searcher_grid)
+    s.set_start(Node(pair[0]))
+    s.set_goal(Node(pair[1]))
+    s.find_path()
+    return s.get_path_states()
+
+
+def plan_many(map, pairs, workers=None, connectivity=4):
+    # Plan a path for every (start, goal) pair. The map is an occupancy array or
+    # an image path and is loaded once. Returns the paths, each an array of states
+    # from start to goal in the order of pairs, and a dict of throughput stats.
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if isinstance(map, str):
+        map = loadOccupancyArray(map)
+
+    free, cols, steps = createPaddedGrid(map, connectivity)
+    shared_free = multiprocessing.RawArray('B', len(free))
+    np.frombuffer(shared_free, dtype=np.bool_)[:] = free
+
+    t_start = time.time()
+    pool = multiprocessing.Pool(workers, initializer=_initWorker, initargs=(shared_free, cols, steps))
+    try:
+        chunksize = max(1, len(pairs) // (4 * workers))
+        paths = pool.map(_planPair, pairs, chunksize)
+    finally:
+        pool.close()
+        pool.join()
+    elapsed = time.time() - t_start
+
+    stats = {'queries': len(pairs), 'workers': workers, 'seconds': elapsed,
+             'queries_per_sec': len(pairs) / elapsed if elapsed > 0 else float("inf")}
+    return paths, stats
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('image_file', nargs='?', default='Simple_maze.png')
+    parser.add_argument('--pairs', type=int, default=200,
+                        help='number of random start/goal pairs')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        help='pool sizes to time, defaults to 1 up to the core count')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output',
+                        help='file to write the planned paths to, in a path_io format by extension')
+    args = parser.parse_args()
+
+    # Draw the pairs from free cells.
+    arr_map = loadOccupancyArray(args.image_file)
+    free_states = np.column_stack(np.nonzero(arr_map > 0))
+    rng = np.random.RandomState(args.seed)
+    choice = rng.randint(len(free_states), size=(args.pairs, 2))
+    pairs = [(free_states[s].tolist(), free_states[g].tolist()) for s, g in choice]
+
+    workers = args.workers
+    if not workers:
+        workers = sorted(set([1, 2, 4, 8, 16, multiprocessing.cpu_count()]))
+        workers = [n for n in workers if n <= multiprocessing.cpu_count()]
+
+    print("%8s %12s %14s %10s" % ('workers', 'seconds', 'queries/sec', 'speedup'))
+    base_rate = None
+    for n in workers:
+        paths, stats = plan_many(arr_map, pairs, workers=n)
+        if base_rate is None:
+            base_rate = stats['queries_per_sec']
+        print("%8d %12.3f %14.1f %10.2f" % (n, stats['seconds'], stats['queries_per_sec'],
+                                           stats['queries_per_sec'] / base_rate))
+
+    if args.output:
+        savePaths(args.output, paths)
+        print("Wrote %d paths to %s" % (len(paths), args.output))
+
+if __name__ == '__main__':
+    main()
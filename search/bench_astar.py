@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file bench_astar.py Script for comparing the heap based searcher against the list based one.
+
+import argparse
+from astar_rough import ListSearcher
+from astar_rough import Searcher
+from bench_search import benchCases
+from bench_search import timeSearch
+from node_maps import createMapFromArray
+
+
+def getNode(node_set, state):
+    return [node for node in node_set if tuple(node.get_state()) == tuple(state)][0]
+
+
+def pathStates(s):
+    return [tuple(node.get_state()) for node in s._path]
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[25, 50, 100, 200],
+                        help='cells per side of the synthetic mazes')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed for the synthetic mazes')
+    parser.add_argument('--max-reference-cells', type=int, default=10000,
+                        help='skip the list based searcher on maps with more free cells than this')
+    args = parser.parse_args()
+
+    cases = benchCases(['Simple_maze_small1.png', 'Simple_maze.png'], 0)
+    for size in args.sizes:
+        for _, arr_map, start, goal in benchCases(['maze'], 2 * size, args.seed):
+            cases.append(('maze ' + str(size) + 'x' + str(size), arr_map, start, goal))
+
+    print("%-24s %10s %8s %12s %12s %8s" % ('map', 'free cells', 'path', 'heap [s]', 'list [s]', 'same'))
+    for name, arr_map, start, goal in cases:
+        node_set = createMapFromArray(arr_map)
+        n_s = getNode(node_set, start)
+        n_f = getNode(node_set, goal)
+
+        heap_s = Searcher()
+        heap_time, _ = timeSearch(heap_s, n_s, n_f)
+
+        # The list based searcher is quadratic, so only run it on small maps.
+        list_time = 'skipped'
+        same = 'n/a'
+        if len(node_set) <= args.max_reference_cells:
+            list_s = ListSearcher()
+            elapsed, _ = timeSearch(list_s, n_s, n_f)
+            list_time = "%.4f" % elapsed
+            same = str(pathStates(heap_s) == pathStates(list_s))
+
+        print("%-24s %10d %8d %12.4f %12s %8s" % (name, len(node_set), heap_s.path_length(), heap_time, list_time, same))
+
+if __name__ == '__main__':
+    main()
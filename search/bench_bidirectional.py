@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file bench_bidirectional.py Script for comparing A* against bidirectional A* on grid maps.
+
+import argparse
+from astar_rough import MODE_ASTAR
+from astar_rough import MODE_BIDIRECTIONAL
+from astar_rough import Searcher
+from bench_search import benchCases
+from bench_search import timeSearch
+from nodes import Node
+
+
+def runSearch(arr_map, start, goal, mode, threaded=False):
+    s = Searcher()
+    s.add_grid(arr_map)
+    s.set_mode(mode)
+    s.set_threaded(threaded)
+    elapsed, cost = timeSearch(s, Node(start), Node(goal))
+    return elapsed, cost, s
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=300,
+                        help='side of the generated maze')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cases = benchCases(['Simple_maze_small1.png', 'Simple_maze.png', 'maze'], args.size, args.seed)
+
+    print("%-24s %-14s %10s %10s %10s %10s %10s %10s" %
+          ('map', 'mode', 'exp', 'fwd exp', 'bwd exp', 'fwd [s]', 'bwd [s]', 'wall [s]'))
+    for name, arr_map, start, goal in cases:
+        elapsed, astar_cost, s = runSearch(arr_map, start, goal, MODE_ASTAR)
+        print("%-24s %-14s %10d %10s %10s %10s %10s %10.4f" %
+              (name, 'A*', s.expansion_count(), '', '', '', '', elapsed))
+
+        for label, threaded in [('bidirectional', False), ('bidir threads', True)]:
+            elapsed, cost, s = runSearch(arr_map, start, goal, MODE_BIDIRECTIONAL, threaded)
+            stats = s.get_direction_stats()
+            print("%-24s %-14s %10d %10d %10d %10.4f %10.4f %10.4f%s" %
+                  (name, label, s.expansion_count(), stats['forward']['expansions'],
+                   stats['backward']['expansions'], stats['forward']['seconds'], stats['backward']['seconds'],
+                   elapsed, '' if abs(cost - astar_cost) < 1e-6 else '  cost differs'))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file bench_jps.py Script for comparing expansions of A* and jump point search on grid maps.
+
+import argparse
+from astar_rough import MODE_ASTAR
+from astar_rough import MODE_JPS
+from astar_rough import Searcher
+from bench_search import benchCases
+from bench_search import timeSearch
+from nodes import Node
+
+
+def runSearch(arr_map, start, goal, connectivity, mode):
+    s = Searcher()
+    s.add_grid(arr_map, connectivity)
+    s.set_mode(mode)
+    elapsed, cost = timeSearch(s, Node(start), Node(goal))
+    return elapsed, s.expansion_count(), cost
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=500,
+                        help='side of the generated room and maze maps')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cases = benchCases(['Simple_maze.png', 'empty room', 'room with obstacles', 'maze'], args.size, args.seed)
+
+    print("%-20s %4s %10s %10s %10s %10s %10s %10s %6s" %
+          ('map', 'conn', 'A* exp', 'JPS exp', 'ratio', 'A* [s]', 'JPS [s]', 'cost', 'same'))
+    for name, arr_map, start, goal in cases:
+        for connectivity in [4, 8]:
+            astar_time, astar_exp, astar_cost = runSearch(arr_map, start, goal, connectivity, MODE_ASTAR)
+            jps_time, jps_exp, jps_cost = runSearch(arr_map, start, goal, connectivity, MODE_JPS)
+            print("%-20s %4d %10d %10d %10.1f %10.4f %10.4f %10.2f %6s" %
+                  (name, connectivity, astar_exp, jps_exp, astar_exp / float(max(jps_exp, 1)),
+                   astar_time, jps_time, astar_cost, str(abs(astar_cost - jps_cost) < 1e-6)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file bench_landmarks.py Script for measuring landmark table memory against search speed.
+
+import argparse
+import time
+import numpy as np
+from astar_rough import Searcher
+from bench_search import benchCases
+from bench_search import timeSearch
+from landmarks import buildLandmarks
+from nodes import Node
+
+
+def timeQueries(arr_map, queries, connectivity, landmarks):
+    # Total seconds and expansions over all queries.
+    elapsed = 0.0
+    expansions = 0
+    for start, goal in queries:
+        s = Searcher()
+        s.add_grid(arr_map, connectivity)
+        if landmarks is not None:
+            s.add_landmarks(landmarks)
+        elapsed += timeSearch(s, Node(start), Node(goal))[0]
+        expansions += s.expansion_count()
+    return elapsed, expansions
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=400,
+                        help='side of the generated room and maze maps')
+    parser.add_argument('--landmarks', type=int, nargs='+', default=[0, 1, 2, 4, 8, 16],
+                        help='landmark counts to try, 0 is the plain straight line heuristic')
+    parser.add_argument('--queries', type=int, default=20,
+                        help='number of random start/goal pairs per map')
+    parser.add_argument('--connectivity', type=int, default=4, choices=[4, 8])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cases = benchCases(['Simple_maze.png', 'room with obstacles', 'maze'], args.size, args.seed)
+
+    print("%-20s %4s %10s %10s %12s %10s %10s" %
+          ('map', 'K', 'build [s]', 'table [MB]', 'expansions', 'query [s]', 'speedup'))
+    rng = np.random.RandomState(args.seed)
+    for name, arr_map, _, _ in cases:
+        # Same queries for every landmark count, between cells that can reach
+        # each other so every search finds a path.
+        probe = Searcher()
+        probe.add_grid(arr_map, args.connectivity)
+        free_states = np.column_stack(np.nonzero(arr_map > 0))
+        queries = []
+        while len(queries) < args.queries:
+            start, goal = free_states[rng.randint(len(free_states), size=2)].tolist()
+            probe.set_start(Node(start))
+            probe.set_goal(Node(goal))
+            probe.find_path()
+            if probe.path_length():
+                queries.append((start, goal))
+
+        base_time = None
+        for count in args.landmarks:
+            landmarks = None
+            build_time = 0.0
+            table_mb = 0.0
+            if count > 0:
+                t_start = time.time()
+                landmarks = buildLandmarks(arr_map, count, args.connectivity, seed=args.seed)
+                build_time = time.time() - t_start
+                table_mb = landmarks.nbytes() / 1e6
+            query_time, expansions = timeQueries(arr_map, queries, args.connectivity, landmarks)
+            if base_time is None:
+                base_time = query_time
+            print("%-20s %4d %10.2f %10.1f %12d %10.4f %10.2f" %
+                  (name, count, build_time, table_mb, expansions, query_time / len(queries),
+                   base_time / query_time))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file bench_nodes.py Script for comparing hash and equality throughput of Node and GridNode.
+
+import argparse
+import time
+import numpy as np
+from astar_rough import Searcher
+from node_maps import createMapFromArray
+from node_maps import loadOccupancyArray
+from nodes import GridNode
+from nodes import Node
+
+
+def opsPerSecond(func, items, repeats):
+    t_start = time.time()
+    for _ in range(repeats):
+        func(items)
+    return repeats * len(items) / (time.time() - t_start)
+
+
+def hashAll(nodes):
+    for node in nodes:
+        hash(node)
+
+
+def compareAll(nodes):
+    for node, other in zip(nodes, nodes[1:]):
+        node == other
+
+
+def lookupAll(nodes):
+    table = dict.fromkeys(nodes)
+    for node in nodes:
+        node in table
+
+
+def timeSearch(node_type, arr_map, start, goal):
+    node_set = createMapFromArray(arr_map, node_type=node_type)
+    lookup = dict((tuple(node.get_state()), node) for node in node_set)
+    s = Searcher()
+    s.set_start(lookup[start])
+    s.set_goal(lookup[goal])
+    t_start = time.time()
+    s.find_path()
+    return time.time() - t_start
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=100000,
+                        help='number of nodes to hash and compare')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='passes over the nodes per measurement')
+    args = parser.parse_args()
+
+    side = int(np.ceil(np.sqrt(args.nodes)))
+    states = [(idx // side, idx % side) for idx in range(args.nodes)]
+
+    print("%-12s %14s %14s %14s" % ('node type', 'hash [1/s]', 'eq [1/s]', 'lookup [1/s]'))
+    for node_type in [Node, GridNode]:
+        nodes = [node_type(state) for state in states]
+        print("%-12s %14.0f %14.0f %14.0f" % (node_type.__name__,
+                                              opsPerSecond(hashAll, nodes, args.repeats),
+                                              opsPerSecond(compareAll, nodes, args.repeats),
+                                              opsPerSecond(lookupAll, nodes, args.repeats)))
+
+    # Same search on both node types.
+    arr_map = loadOccupancyArray('Simple_maze.png')
+    for node_type in [Node, GridNode]:
+        elapsed = timeSearch(node_type, arr_map, (14, 373), (585, 585))
+        print("Simple_maze.png search with " + node_type.__name__ + ": %.4f s" % elapsed)
+
+if __name__ == '__main__':
+    main()
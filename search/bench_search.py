@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file bench_search.py Script for benchmarking map building and search on generated maps.
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from astar_rough import Searcher
+from node_maps import createMapFromImage
+from node_maps import createMazeArray
+from node_maps import createRandomArray
+from node_maps import createRoomsArray
+from node_maps import loadOccupancyArray
+from nodes import Node
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+FIELDS = ['map', 'size', 'connectivity', 'stage', 'seconds', 'peak_mb', 'nodes', 'expansions',
+          'path_length', 'found']
+
+# Maps the bench scripts compare searches on, see benchCases.
+BENCH_MAPS = ['Simple_maze_small1.png', 'Simple_maze.png', 'empty room', 'room with obstacles', 'random', 'maze']
+
+
+def benchCases(names, size, seed=None):
+    # The named maps of BENCH_MAPS as (name, occupancy array, start, goal).
+    # Generated maps are size cells per side, searched corner to corner. Images
+    # are read from the working directory.
+    cases = []
+    for name in names:
+        if name == 'Simple_maze_small1.png':
+            cases.append((name, loadOccupancyArray(name), (85, 5), (38, 42)))
+        elif name == 'Simple_maze.png':
+            cases.append((name, loadOccupancyArray(name), (14, 373), (585, 585)))
+        elif name == 'empty room':
+            cases.append((name, createRoomsArray(size, size, 0), (1, 1), (size - 2, size - 2)))
+        elif name == 'room with obstacles':
+            cases.append((name, createRoomsArray(size, size, 40, seed=seed), (1, 1), (size - 2, size - 2)))
+        elif name == 'random':
+            arr_map = createRandomArray(size, size, 0.1, seed=seed)
+            # Clear the corners so the start and goal are not walled in.
+            arr_map[:3, :3] = 1
+            arr_map[-3:, -3:] = 1
+            cases.append((name, arr_map, (0, 0), (size - 1, size - 1)))
+        elif name == 'maze':
+            # Mazes have a wall on every side, so the corners are a cell in.
+            end = 2 * (size // 2) - 1
+            cases.append((name, createMazeArray(size // 2, size // 2, seed=seed), (1, 1), (end, end)))
+        else:
+            raise ValueError("unknown bench map " + str(name))
+    return cases
+
+
+def timeSearch(s, start_node, goal_node):
+    # Seconds find_path takes on a searcher that has its map, and the cost of the
+    # path it found, inf if there is none.
+    s.set_start(start_node)
+    s.set_goal(goal_node)
+    t_start = time.time()
+    s.find_path()
+    elapsed = time.time() - t_start
+    return elapsed, s._path[0].get_gscore() if s._path else float("inf")
+
+
+def generateMap(kind, size, seed):
+    # Square occupancy array of a kind of map, with its start and goal cells.
+    if kind == 'random':
+        arr_map = createRandomArray(size, size, seed=seed)
+        # Clear the corners so the start and goal are not walled in.
+        arr_map[:3, :3] = 1
+        arr_map[-3:, -3:] = 1
+    elif kind == 'maze':
+        arr_map = createMazeArray((size - 1) // 2, (size - 1) // 2, seed=seed)
+    else:
+        arr_map = createRoomsArray(size, size, 2 * size // 32, seed=seed)
+
+    # Search between the first and last free cells, top left to bottom right.
+    free_states = np.column_stack(np.nonzero(arr_map > 0))
+    return arr_map, free_states[0].tolist(), free_states[-1].tolist()
+
+
+def measure(func, memory):
+    # Seconds taken by func and its result. With memory the peak of memory
+    # allocated during a second run is returned too, in MB, otherwise None.
+    t_start = time.time()
+    result = func()
+    seconds = time.time() - t_start
+    peak_mb = None
+    if memory and tracemalloc is not None:
+        result = None
+        tracemalloc.start()
+        result = func()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return seconds, peak_mb, result
+
+
+def searchRow(s, seconds, peak_mb):
+    # Fields of a search result.
+    found = s.path_length() > 0
+    return {'seconds': seconds, 'peak_mb': peak_mb, 'expansions': s.expansion_count(),
+            'path_length': s._path[0].get_gscore() if found else float('inf'), 'found': found}
+
+
+def benchMap(kind, size, connectivity, args, work_dir):
+    # Rows of results for one generated map.
+    arr_map, start, goal = generateMap(kind, size, args.seed)
+    base = {'map': kind, 'size': size, 'connectivity': connectivity,
+            'nodes': int(np.count_nonzero(arr_map))}
+    rows = []
+
+    def gridSearch():
+        s = Searcher()
+        s.add_grid(arr_map, connectivity)
+        s.set_start(Node(start))
+        s.set_goal(Node(goal))
+        s.find_path()
+        return s
+
+    seconds, peak_mb, s = measure(gridSearch, args.memory)
+    rows.append(dict(base, stage='search_grid', **searchRow(s, seconds, peak_mb)))
+
+    if size > args.max_graph_size:
+        return rows
+
+    # Building the node graph goes through the image and graph file cache, so
+    # time it once with an empty cache and once with the graph file in place.
+    image_path = os.path.join(work_dir, '%s_%d.png' % (kind, size))
+    Image.fromarray((arr_map > 0).astype(np.uint8) * 255).save(image_path)
+    cache_dir = os.path.join(work_dir, 'cache_%s_%d_%d' % (kind, size, connectivity))
+
+    def buildGraph():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        return createMapFromImage(image_path, connectivity, cache_dir=cache_dir)
+
+    def loadGraph():
+        return createMapFromImage(image_path, connectivity, cache_dir=cache_dir)
+
+    seconds, peak_mb, node_set = measure(buildGraph, args.memory)
+    rows.append(dict(base, stage='build_graph', seconds=seconds, peak_mb=peak_mb))
+    seconds, peak_mb, node_set = measure(loadGraph, args.memory)
+    rows.append(dict(base, stage='load_graph', seconds=seconds, peak_mb=peak_mb))
+
+    # Node searches start from the map's own nodes.
+    nodes = dict((tuple(node.get_state().tolist()), node) for node in node_set)
+    start_node = nodes[tuple(start)]
+    goal_node = nodes[tuple(goal)]
+
+    def graphSearch():
+        s = Searcher()
+        s.add_map(node_set)
+        s.set_start(start_node)
+        s.set_goal(goal_node)
+        s.find_path()
+        return s
+
+    seconds, peak_mb, s = measure(graphSearch, args.memory)
+    rows.append(dict(base, stage='search_graph', **searchRow(s, seconds, peak_mb)))
+    return rows
+
+
+def writeResults(rows, path):
+    # CSV unless the path ends in .json.
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump(rows, f, indent=2, sort_keys=True)
+            f.write('\n')
+        return
+    with open(path, 'w') as f:
+        writer = csv.DictWriter(f, FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[64, 256, 1024, 4096],
+                        help='sides of the generated maps')
+    parser.add_argument('--maps', nargs='+', default=['random', 'maze', 'rooms'],
+                        choices=['random', 'maze', 'rooms'])
+    parser.add_argument('--connectivity', type=int, nargs='+', default=[4, 8], choices=[4, 8])
+    parser.add_argument('--max-graph-size', type=int, default=512,
+                        help='largest side to build node graphs for, they take a lot of memory')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='skip the second run of each step that measures peak memory')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_search.csv',
+                        help='results file, JSON if it ends in .json and CSV otherwise')
+    args = parser.parse_args()
+
+    print("%-8s %6s %4s %-14s %10s %10s %10s %10s" %
+          ('map', 'size', 'conn', 'stage', 'time [s]', 'peak [MB]', 'expansions', 'cost'))
+    rows = []
+    work_dir = tempfile.mkdtemp()
+    try:
+        for size in args.sizes:
+            for kind in args.maps:
+                for connectivity in args.connectivity:
+                    for row in benchMap(kind, size, connectivity, args, work_dir):
+                        print("%-8s %6d %4d %-14s %10.4f %10s %10s %10s" %
+                              (row['map'], row['size'], row['connectivity'], row['stage'], row['seconds'],
+                               '' if row['peak_mb'] is None else '%.1f' % row['peak_mb'],
+                               row.get('expansions', ''),
+                               '%.1f' % row['path_length'] if 'path_length' in row else ''))
+                        rows.append(row)
+                    # Write as we go so a long run can be stopped early.
+                    writeResults(rows, args.output)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print("Results written to " + args.output)
+
+if __name__ == '__main__':
+    main()
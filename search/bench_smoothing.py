@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file bench_smoothing.py Script for comparing grid paths with their smoothed any-angle versions.
+
+import argparse
+import time
+from astar_rough import Searcher
+from bench_search import benchCases
+from bench_search import timeSearch
+from nodes import Node
+from smoothing import pathLength
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=500,
+                        help='side of the generated maps')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cases = benchCases(['Simple_maze.png', 'room with obstacles', 'random', 'maze'], args.size, args.seed)
+
+    print("%-20s %4s %10s %10s %10s %10s %10s %10s %10s" %
+          ('map', 'conn', 'states', 'waypoints', 'length', 'smoothed', 'A* [s]', 'smooth [s]', 'overhead'))
+    for name, arr_map, start, goal in cases:
+        for connectivity in [4, 8]:
+            s = Searcher()
+            s.add_grid(arr_map, connectivity)
+            search_time, _ = timeSearch(s, Node(start), Node(goal))
+            states = s.get_path_states()
+
+            t_start = time.time()
+            waypoints = s.get_smoothed_path_states()
+            smooth_time = time.time() - t_start
+            print("%-20s %4d %10d %10d %10.1f %10.1f %10.4f %10.4f %9.1f%%" %
+                  (name, connectivity, len(states), len(waypoints), pathLength(states), pathLength(waypoints),
+                   search_time, smooth_time, 100.0 * smooth_time / max(search_time, 1e-9)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file bidirectional.py Module for doing a bidirectional A* search on grid maps.
+
+from heapq import heappop
+from heapq import heappush
+from itertools import count
+import math
+import numpy as np
+from threading import Event
+from threading import Lock
+from threading import Thread
+import time
+
+# Cells are flat indices into a grid laid out by createPaddedGrid. Steps are the
+# (flat offset, row part, col part, cost) tuples from the same function.
+
+
+class _Meeting:
+    def __init__(self):
+        # Cheapest start to goal route found so far and the cell where the two
+        # searches met on it.
+        self.cost = float("inf")
+        self.cell = -1
+        self.lock = Lock()
+
+    def offer(self, cost, cell):
+        if cost < self.cost:
+            with self.lock:
+                if cost < self.cost:
+                    self.cost = cost
+                    self.cell = cell
+
+
+class _Frontier:
+    def __init__(self, free, cols, steps, root, target):
+        # One direction of the search, rooted at root and aimed at target. Both
+        # directions use the average of the two straight line distances as their
+        # heuristic, (to target - to root) / 2. That stays consistent and lets
+        # the search stop as soon as the two lowest open fscores add up to the
+        # cheapest route through a meeting cell.
+        self._free = free
+        self._cols = cols
+        self._steps = steps
+        self._root_row, self._root_col = divmod(root, cols)
+        self._target_row, self._target_col = divmod(target, cols)
+        self._counter = count(1)
+        self.gscores = np.full(len(free), float("inf"))
+        self.parents = np.full(len(free), -1, dtype=np.int32)
+        self.closed = np.zeros(len(free), dtype=bool)
+        self.gscores[root] = 0.0
+        self.open = [(self.cost_to_target(root), 0, root)]
+        self.top = self.open[0][0]
+        self.expansions = 0
+        self.seconds = 0.0
+
+    def cost_to_target(self, idx):
+        row, col = divmod(idx, self._cols)
+        return 0.5 * (math.sqrt((row - self._target_row) ** 2 + (col - self._target_col) ** 2) -
+                      math.sqrt((row - self._root_row) ** 2 + (col - self._root_col) ** 2))
+
+    def top_fscore(self):
+        # Lowest fscore still open, inf once the frontier is exhausted. It is also
+        # kept in top for the other direction to read. It never decreases, so a
+        # stale value read from another thread is still a safe bound.
+        while self.open and self.closed[self.open[0][2]]:
+            heappop(self.open)
+        self.top = self.open[0][0] if self.open else float("inf")
+        return self.top
+
+    def expand(self, other, meeting, record=None):
+        # Expand the cheapest open cell and offer any route through a neighbor
+        # the other direction has already reached.
+        t_start = time.time()
+        free = self._free
+        gscores = self.gscores
+        other_gscores = other.gscores
+        c_fscore, _, c_idx = heappop(self.open)
+        self.closed[c_idx] = True
+        self.expansions += 1
+        if record is not None:
+            record(c_idx, c_fscore)
+
+        c_gscore = gscores[c_idx]
+        for step, row_step, col_step, cost in self._steps:
+            n_idx = c_idx + step
+            if not free[n_idx] or self.closed[n_idx]:
+                continue
+            if row_step and col_step and not (free[c_idx + row_step] and free[c_idx + col_step]):
+                continue
+
+            n_gscore = c_gscore + cost
+            if n_gscore >= gscores[n_idx]:
+                continue
+            gscores[n_idx] = n_gscore
+            self.parents[n_idx] = c_idx
+            heappush(self.open, (n_gscore + self.cost_to_target(n_idx), next(self._counter), n_idx))
+            if other_gscores[n_idx] < float("inf"):
+                meeting.offer(n_gscore + other_gscores[n_idx], n_idx)
+
+        self.seconds += time.time() - t_start
+
+
+def _runFrontier(frontier, other, meeting, done, record):
+    # Expand one direction until the two frontiers prove the meeting is optimal.
+    while not done.is_set():
+        if frontier.top_fscore() + other.top >= meeting.cost:
+            done.set()
+            return
+        frontier.expand(other, meeting, record)
+
+
+def findBidirectionalPath(free, cols, steps, start_idx, goal_idx, threaded=False, record=None):
+    # Search forwards from the start and backwards from the goal at once. Returns
+    # the cells of the path from start to goal, empty if there is none, and the
+    # expansions and seconds spent in each direction. With threaded each direction
+    # runs on its own thread. record(idx, fscore) is called on every expansion.
+    forward = _Frontier(free, cols, steps, start_idx, goal_idx)
+    backward = _Frontier(free, cols, steps, goal_idx, start_idx)
+    meeting = _Meeting()
+    if start_idx == goal_idx:
+        meeting.offer(0.0, start_idx)
+
+    if free[start_idx] and free[goal_idx]:
+        if threaded:
+            done = Event()
+            threads = [Thread(target=_runFrontier, args=(forward, backward, meeting, done, record)),
+                       Thread(target=_runFrontier, args=(backward, forward, meeting, done, record))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        else:
+            # The heuristics of the two directions cancel along any route, so no
+            # route left unseen can cost less than the sum of the lowest open
+            # fscores of both directions.
+            while True:
+                if forward.top_fscore() + backward.top_fscore() >= meeting.cost:
+                    break
+                # Grow the smaller frontier.
+                if len(forward.open) <= len(backward.open):
+                    forward.expand(backward, meeting, record)
+                else:
+                    backward.expand(forward, meeting, record)
+
+    stats = {'forward': {'expansions': forward.expansions, 'seconds': forward.seconds},
+             'backward': {'expansions': backward.expansions, 'seconds': backward.seconds}}
+    if meeting.cell < 0:
+        return [], stats
+
+    path = [meeting.cell]
+    while forward.parents[path[-1]] >= 0:
+        path.append(int(forward.parents[path[-1]]))
+    path.reverse()
+    while backward.parents[path[-1]] >= 0:
+        path.append(int(backward.parents[path[-1]]))
+
+    return path, stats
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file cost_maps.py Module for creating traversal cost maps from grayscale images.
+
+import hashlib
+import numpy as np
+import os
+from PIL import Image
+from node_maps import loadOccupancyArray
+
+# Cost maps hold the cost of moving through each cell, inf for obstacles. A step
+# between two cells costs its length times the mean cost of the two cells, so a
+# map of ones costs the same as the plain occupancy grid.
+
+# Version of the cached obstacle distance files, part of their name.
+DISTANCE_CACHE_VERSION = 2
+
+
+def loadGrayArray(image_path):
+    # Image as 8 bit gray levels, with the same free cells as
+    # node_maps.loadOccupancyArray. Palette images are read by index like the
+    # occupancy grid does, index 0 is black and every other index is white
+    # whatever its color. Other modes are converted to their gray levels.
+    im = Image.open(image_path)
+    if im.mode == 'P':
+        return np.where(loadOccupancyArray(image_path) > 0, 255, 0).astype(np.uint8)
+    return np.array(im.convert('L'))
+
+
+def intensityCosts(gray, max_cost=10.0):
+    # Map gray levels to cell costs. Black (0) is an obstacle, white (255) costs 1
+    # and the levels between rise linearly to max_cost just above black.
+    gray = np.asarray(gray, dtype=float)
+    costs = 1.0 + (max_cost - 1.0) * (255.0 - gray) / 254.0
+    costs[gray <= 0] = float("inf")
+    return costs
+
+
+def obstacleDistance(arr_map, radius):
+    # Euclidean distance from every cell to the nearest obstacle, capped at
+    # radius. Zeros are obstacles and the area outside the map is not. Each
+    # column is scanned for its nearest obstacle and the columns are then
+    # combined with one shifted pass per col offset within the radius, so the
+    # whole map is handled by whole array operations.
+    blocked = np.asarray(arr_map) <= 0
+    rows, cols = blocked.shape
+    cap = int(np.ceil(radius)) + 1
+
+    # Rows to the nearest obstacle in the same column, capped.
+    col_dist = np.where(blocked, 0, cap).astype(np.int64)
+    for row in range(1, rows):
+        np.minimum(col_dist[row], col_dist[row - 1] + 1, out=col_dist[row])
+    for row in range(rows - 2, -1, -1):
+        np.minimum(col_dist[row], col_dist[row + 1] + 1, out=col_dist[row])
+    col_dist = np.minimum(col_dist, cap) ** 2
+
+    dist_sq = col_dist.copy()
+    for shift in range(1, cap + 1):
+        if shift >= cols:
+            break
+        np.minimum(dist_sq[:, shift:], col_dist[:, :-shift] + shift * shift, out=dist_sq[:, shift:])
+        np.minimum(dist_sq[:, :-shift], col_dist[:, shift:] + shift * shift, out=dist_sq[:, :-shift])
+
+    return np.minimum(np.sqrt(dist_sq), radius)
+
+
+def inflateCosts(costs, distance, radius, weight=10.0):
+    # Raise the costs of cells within radius of an obstacle, by up to weight
+    # times their cost right next to it, falling off linearly with distance.
+    if radius <= 0:
+        return costs
+    return costs * (1.0 + weight * np.clip(1.0 - distance / float(radius), 0.0, 1.0))
+
+
+def loadCachedDistance(image_path, radius, cache_dir=None):
+    # Obstacle distance of an image map from a file keyed by the image content
+    # and radius, computing and writing it first if there is none. Files go in
+    # the same .graph_cache directory as the graph files by default.
+    with open(image_path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(image_path)), '.graph_cache')
+    path = os.path.join(cache_dir, '%s.r%s.v%d.dist.npy' % (digest, radius, DISTANCE_CACHE_VERSION))
+
+    if os.path.exists(path):
+        return np.load(path, mmap_mode='r')
+
+    distance = obstacleDistance(loadGrayArray(image_path), radius).astype(np.float32)
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    # Written to a temporary file first so readers never see a partial file.
+    tmp_path = path + '.' + str(os.getpid()) + '.tmp.npy'
+    np.save(tmp_path, distance)
+    os.rename(tmp_path, path)
+    return distance
+
+
+def loadCostMap(image_path, max_cost=10.0, inflation_radius=0, inflation_weight=10.0, cache_dir=None):
+    # Cost map of a grayscale image, see intensityCosts, inflated around the
+    # obstacles when inflation_radius is set. The obstacle distance behind the
+    # inflation is only computed once per image and radius, see
+    # loadCachedDistance.
+    costs = intensityCosts(loadGrayArray(image_path), max_cost)
+    if inflation_radius > 0:
+        distance = loadCachedDistance(image_path, inflation_radius, cache_dir)
+        costs = inflateCosts(costs, distance, inflation_radius, inflation_weight)
+    return costs
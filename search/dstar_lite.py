@@ -0,0 +1,274 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file dstar_lite.py Module for incremental replanning with D* Lite on grid maps.
+
+import argparse
+from heapq import heappop
+from heapq import heappush
+import math
+import numpy as np
+import time
+from astar_rough import Searcher
+from node_maps import createPaddedGrid
+from node_maps import GRID_OFFSETS_8
+from node_maps import loadOccupancyArray
+from nodes import Node
+
+
+class DStarLite:
+    def __init__(self, arr_map, connectivity=4):
+        # Cells are flat indices into the padded grid, see createPaddedGrid. The
+        # search runs backwards from the goal, so g and rhs are costs to the goal
+        # and stay valid while the start moves and cells change.
+        self._free, self._cols, self._steps = createPaddedGrid(arr_map, connectivity)
+        self._g = np.full(len(self._free), float("inf"))
+        self._rhs = np.full(len(self._free), float("inf"))
+        # Queue entries are (key1, key2, version, cell). Only the entry matching a
+        # cell's current version is live, older ones are skipped when popped.
+        self._queue = []
+        self._version = np.zeros(len(self._free), dtype=np.int64)
+        self._km = 0.0
+        self._start = None
+        self._last_start = None
+        self._goal = None
+        self._initialized = False
+        self._expansions = 0
+
+    def _to_index(self, state):
+        return (int(state[0]) + 1) * self._cols + int(state[1]) + 1
+
+    def _to_state(self, idx):
+        row, col = divmod(idx, self._cols)
+        return [row - 1, col - 1]
+
+    def _heuristic(self, idx1, idx2):
+        row1, col1 = divmod(idx1, self._cols)
+        row2, col2 = divmod(idx2, self._cols)
+        return math.sqrt((row1 - row2) ** 2 + (col1 - col2) ** 2)
+
+    def _cost(self, idx, step):
+        flat_step, row_step, col_step, cost = step
+        free = self._free
+        if not (free[idx] and free[idx + flat_step]):
+            return float("inf")
+        if row_step and col_step and not (free[idx + row_step] and free[idx + col_step]):
+            return float("inf")
+        return cost
+
+    def _key(self, idx):
+        m = min(self._g[idx], self._rhs[idx])
+        return (m + self._heuristic(self._start, idx) + self._km, m)
+
+    def _update_rhs(self, idx):
+        # One step lookahead cost of a cell from its neighbors' g values.
+        if idx == self._goal:
+            return
+        if not self._free[idx]:
+            # Blocked cells, including the border, have no edges.
+            self._rhs[idx] = float("inf")
+            return
+        g = self._g
+        self._rhs[idx] = min([self._cost(idx, step) + g[idx + step[0]] for step in self._steps])
+
+    def _update_queue(self, idx):
+        # Queue the cell if it is inconsistent, otherwise drop any queued entry.
+        self._version[idx] += 1
+        if self._g[idx] != self._rhs[idx]:
+            key = self._key(idx)
+            heappush(self._queue, (key[0], key[1], self._version[idx], idx))
+
+    def _top(self):
+        # Pop stale entries until the top of the queue is live.
+        while self._queue and self._queue[0][2] != self._version[self._queue[0][3]]:
+            heappop(self._queue)
+        return self._queue[0] if self._queue else None
+
+    def set_start(self, state):
+        idx = self._to_index(state)
+        if self._initialized:
+            # Keys already queued stay valid lower bounds by adding the distance moved.
+            self._km += self._heuristic(self._last_start, idx)
+            self._last_start = idx
+        self._start = idx
+
+    def set_goal(self, state):
+        self._goal = self._to_index(state)
+        self._initialized = False
+
+    def _initialize(self):
+        self._g.fill(float("inf"))
+        self._rhs.fill(float("inf"))
+        self._version.fill(0)
+        self._queue = []
+        self._km = 0.0
+        self._last_start = self._start
+        self._rhs[self._goal] = 0.0
+        self._update_queue(self._goal)
+        self._initialized = True
+
+    def update_cells(self, changes):
+        # Apply (state, value) changes to the occupancy. Zero values are obstacles.
+        # Only the cells whose edges changed are repaired, the next find_path
+        # propagates the change through the rest of the search tree.
+        cols = self._cols
+        affected = set()
+        for state, value in changes:
+            idx = self._to_index(state)
+            if self._free[idx] == (value > 0):
+                continue
+            self._free[idx] = value > 0
+            # A cell is the corner of diagonal edges between its 4 neighbors, so all
+            # 8 neighbors can lose or gain edges.
+            affected.add(idx)
+            affected.update(idx + dr * cols + dc for dr, dc in GRID_OFFSETS_8)
+
+        if not self._initialized:
+            return
+        for idx in affected:
+            self._update_rhs(idx)
+            self._update_queue(idx)
+
+    def _compute_shortest_path(self):
+        g = self._g
+        rhs = self._rhs
+        steps = self._steps
+        start = self._start
+        while True:
+            top = self._top()
+            if top is None or (top[:2] >= self._key(start) and rhs[start] == g[start]):
+                return
+
+            heappop(self._queue)
+            self._expansions += 1
+            idx = top[3]
+            key = self._key(idx)
+            if top[:2] < key:
+                # The key grew since the cell was queued.
+                self._version[idx] += 1
+                heappush(self._queue, (key[0], key[1], self._version[idx], idx))
+            elif g[idx] > rhs[idx]:
+                # Overconsistent, so the cell's cost can only help its neighbors.
+                g[idx] = rhs[idx]
+                self._version[idx] += 1
+                for step in steps:
+                    n_idx = idx + step[0]
+                    if n_idx != self._goal:
+                        rhs[n_idx] = min(rhs[n_idx], self._cost(idx, step) + g[idx])
+                    self._update_queue(n_idx)
+            else:
+                # Underconsistent, so everything that routed through it needs a look.
+                g[idx] = float("inf")
+                self._update_rhs(idx)
+                self._update_queue(idx)
+                for step in steps:
+                    n_idx = idx + step[0]
+                    self._update_rhs(n_idx)
+                    self._update_queue(n_idx)
+
+    def expansion_count(self):
+        # Cells popped from the queue by the last find_path.
+        return self._expansions
+
+    def get_cost(self):
+        # Cost of the current path from start to goal, inf if there is none.
+        return float(self._g[self._start])
+
+    def find_path(self):
+        # States from start to goal as rows of an array, empty if there is no path.
+        self._expansions = 0
+        if not self._initialized:
+            self._initialize()
+        self._compute_shortest_path()
+
+        g = self._g
+        idx = self._start
+        if g[idx] == float("inf"):
+            return np.zeros((0, 2), dtype=np.int64)
+
+        path = [idx]
+        while idx != self._goal and len(path) < len(g):
+            idx = min([(self._cost(idx, step) + g[idx + step[0]], idx + step[0]) for step in self._steps])[1]
+            path.append(idx)
+
+        rows, cols = np.divmod(np.array(path), self._cols)
+        return np.column_stack([rows - 1, cols - 1])
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('image_file', nargs='?', default='Simple_maze.png')
+    parser.add_argument('--start', type=int, nargs=2, default=[14, 373])
+    parser.add_argument('--goal', type=int, nargs=2, default=[585, 585])
+    parser.add_argument('--rounds', type=int, default=10)
+    parser.add_argument('--cells', type=int, default=5,
+                        help='cells on the current path to block each round')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    arr_map = loadOccupancyArray(args.image_file).copy()
+    rng = np.random.RandomState(args.seed)
+
+    d = DStarLite(arr_map)
+    d.set_start(args.start)
+    d.set_goal(args.goal)
+    t_start = time.time()
+    path = d.find_path()
+    print("Initial plan: %d states, %d expansions, %.4f s" % (len(path), d.expansion_count(), time.time() - t_start))
+
+    # Each round unblocks the previous round's cells and blocks a few on the path.
+    print("%6s %10s %12s %12s %12s %12s %6s" % ('round', 'changes', 'D* exp', 'D* [s]', 'A* exp', 'A* [s]', 'same'))
+    blocked = []
+    for n_round in range(args.rounds):
+        changes = [(state, 1) for state in blocked]
+        blocked = []
+        if len(path) > 2:
+            picks = rng.choice(np.arange(1, len(path) - 1), size=min(args.cells, len(path) - 2), replace=False)
+            blocked = [tuple(path[pick]) for pick in picks]
+        changes += [(state, 0) for state in blocked]
+        for state, value in changes:
+            arr_map[state] = value
+
+        t_start = time.time()
+        d.update_cells(changes)
+        path = d.find_path()
+        dstar_time = time.time() - t_start
+
+        s = Searcher()
+        s.add_grid(arr_map)
+        s.set_start(Node(args.start))
+        s.set_goal(Node(args.goal))
+        t_start = time.time()
+        s.find_path()
+        astar_time = time.time() - t_start
+        astar_cost = s._path[0].get_gscore() if s._path else float("inf")
+
+        print("%6d %10d %12d %12.4f %12d %12.4f %6s" %
+              (n_round, len(changes), d.expansion_count(), dstar_time, s.expansion_count(), astar_time,
+               str(abs(astar_cost - d.get_cost()) < 1e-6 or astar_cost == d.get_cost())))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file hierarchical.py Module for hierarchical path finding (HPA*) on large grid maps.
+
+import argparse
+from heapq import heappop
+from heapq import heappush
+from itertools import count
+import math
+import numpy as np
+import os
+import time
+from astar_rough import Searcher
+from node_maps import loadOccupancyArray
+from node_maps import mapDigest
+from nodes import Node
+
+# The abstract graph is built for 4 connected grids with unit step costs.
+# Entrance runs at least this long get a transition at each end, shorter ones
+# get one in the middle.
+LONG_ENTRANCE = 6
+
+
+def clusterDistances(free, sources):
+    # Step distances from each source cell to every cell of a small grid, found by
+    # growing all the wavefronts at once with shifted masks. -1 is unreachable.
+    rows, cols = free.shape
+    dist = np.full((len(sources), rows, cols), -1, dtype=np.int32)
+    if not len(sources):
+        return dist
+
+    frontier = np.zeros(dist.shape, dtype=bool)
+    src_rows, src_cols = np.array(sources).T
+    frontier[np.arange(len(sources)), src_rows, src_cols] = True
+    dist[frontier] = 0
+    ring = 0
+    while frontier.any():
+        ring += 1
+        grown = np.zeros_like(frontier)
+        grown[:, 1:, :] |= frontier[:, :-1, :]
+        grown[:, :-1, :] |= frontier[:, 1:, :]
+        grown[:, :, 1:] |= frontier[:, :, :-1]
+        grown[:, :, :-1] |= frontier[:, :, 1:]
+        frontier = grown & free & (dist < 0)
+        dist[frontier] = ring
+
+    return dist
+
+
+def _entranceRuns(both_free):
+    # Start and end (exclusive) of each run of True in a 1D array.
+    edges = np.diff(np.concatenate([[0], both_free.astype(np.int8), [0]]))
+    return zip(np.nonzero(edges == 1)[0], np.nonzero(edges == -1)[0])
+
+
+class AbstractGraph:
+    def __init__(self, shape, cluster_size, coords, indptr, indices, costs, digest):
+        # Nodes are entrance cells at coords. Edges are in CSR form like
+        # createGridGraph, with the cost of each edge in costs.
+        self._shape = tuple(shape)
+        self._cluster_size = int(cluster_size)
+        self._coords = coords
+        self._indptr = indptr
+        self._indices = indices
+        self._costs = costs
+        self._digest = digest
+
+    def get_digest(self):
+        return self._digest
+
+    def get_cluster_size(self):
+        return self._cluster_size
+
+    def get_coords(self):
+        return self._coords
+
+    def node_count(self):
+        return len(self._coords)
+
+    def edge_count(self):
+        return len(self._indices)
+
+    def get_edges(self, node):
+        start, end = self._indptr[node], self._indptr[node + 1]
+        return zip(self._indices[start:end].tolist(), self._costs[start:end].tolist())
+
+    def cluster_of(self, state):
+        return (int(state[0]) // self._cluster_size, int(state[1]) // self._cluster_size)
+
+    def cluster_extents(self, cluster):
+        # Rows and cols covered by a cluster as [row start, row end, col start, col end).
+        r0 = cluster[0] * self._cluster_size
+        c0 = cluster[1] * self._cluster_size
+        return (r0, min(r0 + self._cluster_size, self._shape[0]),
+                c0, min(c0 + self._cluster_size, self._shape[1]))
+
+    def cluster_nodes(self, cluster):
+        clusters = self._coords // self._cluster_size
+        return np.nonzero((clusters[:, 0] == cluster[0]) & (clusters[:, 1] == cluster[1]))[0]
+
+    def save(self, path):
+        np.savez(path, shape=np.array(self._shape), cluster_size=np.array(self._cluster_size),
+                 coords=self._coords, indptr=self._indptr, indices=self._indices, costs=self._costs,
+                 digest=np.array(self._digest))
+
+
+def loadAbstractGraph(path, arr_map=None):
+    # Load a graph written by AbstractGraph.save. If the map is given, the graph
+    # must have been built from it.
+    data = np.load(path)
+    graph = AbstractGraph(data['shape'], data['cluster_size'], data['coords'], data['indptr'],
+                          data['indices'], data['costs'], str(data['digest']))
+    if arr_map is not None and mapDigest(arr_map) != graph.get_digest():
+        raise ValueError("abstract graph " + str(path) + " was built from a different map")
+    return graph
+
+
+def buildAbstractGraph(arr_map, cluster_size=32):
+    # Split the map into square clusters, place transitions on the free runs of
+    # each border between clusters and connect the transitions inside each
+    # cluster by their step distances. Zeros are obstacles.
+    free = np.asarray(arr_map) > 0
+    rows, cols = free.shape
+    node_ids = {}
+    coords = []
+    edges = []
+
+    def nodeId(state):
+        if state not in node_ids:
+            node_ids[state] = len(coords)
+            coords.append(state)
+        return node_ids[state]
+
+    def addTransitions(cells1, cells2):
+        # cells1 and cells2 are matching (row, col) arrays along both sides of a border.
+        both_free = free[cells1[0], cells1[1]] & free[cells2[0], cells2[1]]
+        for start, end in _entranceRuns(both_free):
+            if end - start < LONG_ENTRANCE:
+                picks = [(start + end - 1) // 2]
+            else:
+                picks = [start, end - 1]
+            for pick in picks:
+                n1 = nodeId((int(cells1[0][pick]), int(cells1[1][pick])))
+                n2 = nodeId((int(cells2[0][pick]), int(cells2[1][pick])))
+                edges.append((n1, n2, 1.0))
+                edges.append((n2, n1, 1.0))
+
+    # Transitions across borders between vertically and horizontally adjacent clusters.
+    for r0 in range(0, rows, cluster_size):
+        r1 = min(r0 + cluster_size, rows)
+        for c in range(cluster_size, cols, cluster_size):
+            span = np.arange(r0, r1)
+            addTransitions((span, np.full(len(span), c - 1)), (span, np.full(len(span), c)))
+    for c0 in range(0, cols, cluster_size):
+        c1 = min(c0 + cluster_size, cols)
+        for r in range(cluster_size, rows, cluster_size):
+            span = np.arange(c0, c1)
+            addTransitions((np.full(len(span), r - 1), span), (np.full(len(span), r), span))
+
+    coords = np.array(coords, dtype=np.int64).reshape((-1, 2))
+
+    # Intra cluster edges from one multi source wavefront per cluster.
+    clusters = coords // cluster_size
+    order = np.lexsort((clusters[:, 1], clusters[:, 0]))
+    keys = clusters[order]
+    bounds = np.nonzero(np.any(np.diff(keys, axis=0) != 0, axis=1))[0] + 1
+    for members in np.split(order, bounds):
+        if not len(members):
+            continue
+        r0, c0 = clusters[members[0]] * cluster_size
+        local = coords[members] - [r0, c0]
+        dist = clusterDistances(free[r0:r0 + cluster_size, c0:c0 + cluster_size], local)
+        steps = dist[:, local[:, 0], local[:, 1]]
+        for i, j in zip(*np.nonzero(steps > 0)):
+            edges.append((int(members[i]), int(members[j]), float(steps[i, j])))
+
+    # Compress the edges into CSR form.
+    edges = np.array(edges, dtype=np.float64).reshape((-1, 3))
+    edges = edges[np.lexsort((edges[:, 1], edges[:, 0]))]
+    src = edges[:, 0].astype(np.int64)
+    indptr = np.zeros(len(coords) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=len(coords)), out=indptr[1:])
+
+    return AbstractGraph((rows, cols), cluster_size, coords, indptr, edges[:, 1].astype(np.int64),
+                         edges[:, 2].copy(), mapDigest(arr_map))
+
+
+class HierarchicalSearcher:
+    def __init__(self, arr_map, graph):
+        self._free = np.asarray(arr_map) > 0
+        self._graph = graph
+        self._expansions = 0
+
+    def expansion_count(self):
+        # Abstract nodes expanded by the last query.
+        return self._expansions
+
+    def _connect(self, state):
+        # Edges from a cell to the transitions of its cluster, as (node, cost).
+        graph = self._graph
+        r0, r1, c0, c1 = graph.cluster_extents(graph.cluster_of(state))
+        members = graph.cluster_nodes(graph.cluster_of(state))
+        local = [(int(state[0]) - r0, int(state[1]) - c0)]
+        dist = clusterDistances(self._free[r0:r1, c0:c1], local)[0]
+        steps = dist[graph.get_coords()[members, 0] - r0, graph.get_coords()[members, 1] - c0]
+        return [(int(node), float(cost)) for node, cost in zip(members, steps) if cost >= 0], dist
+
+    def find_abstract_path(self, start, goal):
+        # Waypoints from start to goal through the abstract graph, as a list of
+        # (row, col) tuples. Empty if there is no path.
+        graph = self._graph
+        start = (int(start[0]), int(start[1]))
+        goal = (int(goal[0]), int(goal[1]))
+        self._expansions = 0
+        if not (self._free[start] and self._free[goal]):
+            return []
+
+        # Temporary nodes for the start and goal, numbered after the graph's own.
+        start_id = graph.node_count()
+        goal_id = start_id + 1
+        start_edges, start_dist = self._connect(start)
+        goal_edges = dict(self._connect(goal)[0])
+        if graph.cluster_of(start) == graph.cluster_of(goal):
+            r0, _, c0, _ = graph.cluster_extents(graph.cluster_of(start))
+            steps = start_dist[goal[0] - r0, goal[1] - c0]
+            if steps >= 0:
+                start_edges.append((goal_id, float(steps)))
+
+        coords = graph.get_coords()
+
+        def state_of(node):
+            if node == start_id:
+                return start
+            if node == goal_id:
+                return goal
+            return (int(coords[node, 0]), int(coords[node, 1]))
+
+        def cost_to_goal(node):
+            state = state_of(node)
+            return math.sqrt((state[0] - goal[0]) ** 2 + (state[1] - goal[1]) ** 2)
+
+        gscores = {start_id: 0.0}
+        parents = {start_id: -1}
+        closed = set()
+        counter = count(1)
+        open_set = [(cost_to_goal(start_id), 0, start_id)]
+        while open_set:
+            c_node = heappop(open_set)[2]
+            if c_node in closed:
+                continue
+            self._expansions += 1
+
+            if c_node == goal_id:
+                path = [c_node]
+                while parents[path[-1]] >= 0:
+                    path.append(parents[path[-1]])
+                return [state_of(node) for node in reversed(path)]
+
+            closed.add(c_node)
+            if c_node == start_id:
+                n_edges = start_edges
+            else:
+                n_edges = list(graph.get_edges(c_node))
+                if c_node in goal_edges:
+                    n_edges.append((goal_id, goal_edges[c_node]))
+
+            for n_node, cost in n_edges:
+                if n_node in closed:
+                    continue
+                n_gscore = gscores[c_node] + cost
+                if n_gscore >= gscores.get(n_node, float("inf")):
+                    continue
+                gscores[n_node] = n_gscore
+                parents[n_node] = c_node
+                heappush(open_set, (n_gscore + cost_to_goal(n_node), next(counter), n_node))
+
+        return []
+
+    def refine_segment(self, state1, state2):
+        # Cells from state1 to state2, two consecutive abstract waypoints. Waypoints
+        # in the same cluster are joined by a search restricted to that cluster,
+        # others are the two sides of a transition.
+        graph = self._graph
+        cluster = graph.cluster_of(state1)
+        if cluster != graph.cluster_of(state2):
+            return np.array([state1, state2], dtype=np.int64)
+
+        r0, r1, c0, c1 = graph.cluster_extents(cluster)
+        s = Searcher()
+        s.add_grid(self._free[r0:r1, c0:c1])
+        s.set_start(Node([state1[0] - r0, state1[1] - c0]))
+        s.set_goal(Node([state2[0] - r0, state2[1] - c0]))
+        s.find_path()
+        return s.get_path_states() + [r0, c0]
+
+    def find_path(self, start, goal):
+        # States from start to goal as rows of an array, empty if there is no path.
+        waypoints = self.find_abstract_path(start, goal)
+        if not waypoints:
+            return np.zeros((0, 2), dtype=np.int64)
+        if len(waypoints) == 1:
+            return np.array(waypoints, dtype=np.int64)
+
+        segments = [self.refine_segment(s1, s2) for s1, s2 in zip(waypoints[:-1], waypoints[1:])]
+        # Consecutive segments share their end points.
+        return np.concatenate([segments[0]] + [segment[1:] for segment in segments[1:]])
+
+
+def main():
+    # Get command line args.
+    parser = argparse.ArgumentParser()
+    parser.add_argument('image_file', nargs='?', default='Simple_maze.png')
+    parser.add_argument('--cluster-size', type=int, default=32)
+    parser.add_argument('--graph-file',
+                        help='where to keep the abstract graph, defaults to next to the image')
+    parser.add_argument('--queries', type=int, default=20,
+                        help='number of random start/goal pairs to time')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    arr_map = loadOccupancyArray(args.image_file)
+    graph_file = args.graph_file
+    if graph_file is None:
+        graph_file = os.path.splitext(args.image_file)[0] + '.hpa' + str(args.cluster_size) + '.npz'
+
+    # Preprocess once and reuse the saved graph while the map is unchanged.
+    t_start = time.time()
+    try:
+        graph = loadAbstractGraph(graph_file, arr_map)
+        print("Loaded " + graph_file + " in %.3f s" % (time.time() - t_start))
+    except (IOError, OSError, ValueError):
+        graph = buildAbstractGraph(arr_map, args.cluster_size)
+        graph.save(graph_file)
+        print("Built " + graph_file + " in %.3f s" % (time.time() - t_start))
+    print("%d abstract nodes, %d edges" % (graph.node_count(), graph.edge_count()))
+
+    # Time random queries against the flat search, from cells the flat search can
+    # reach so both have something to do.
+    rng = np.random.RandomState(args.seed)
+    free_states = np.column_stack(np.nonzero(arr_map > 0))
+    h = HierarchicalSearcher(arr_map, graph)
+    flat_times = []
+    hpa_times = []
+    cost_ratios = []
+    while len(flat_times) < args.queries:
+        start, goal = free_states[rng.randint(len(free_states), size=2)].tolist()
+
+        s = Searcher()
+        s.add_grid(arr_map)
+        s.set_start(Node(start))
+        s.set_goal(Node(goal))
+        t_start = time.time()
+        s.find_path()
+        flat_time = time.time() - t_start
+        if not s.path_length():
+            continue
+
+        t_start = time.time()
+        path = h.find_path(start, goal)
+        hpa_times.append(time.time() - t_start)
+        flat_times.append(flat_time)
+        cost_ratios.append((len(path) - 1) / max(1.0, s.path_length() - 1))
+
+    print("%-8s %12s %12s" % ('', 'mean [s]', 'max [s]'))
+    print("%-8s %12.4f %12.4f" % ('flat', np.mean(flat_times), np.max(flat_times)))
+    print("%-8s %12.4f %12.4f" % ('HPA*', np.mean(hpa_times), np.max(hpa_times)))
+    print("Path length vs flat: mean %.3f, max %.3f" % (np.mean(cost_ratios), np.max(cost_ratios)))
+
+if __name__ == '__main__':
+    main()
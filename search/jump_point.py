@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file jump_point.py Module for doing a jump point search on uniform cost grids.
+
+from heapq import heappop
+from heapq import heappush
+from itertools import count
+import math
+
+# Cells are flat indices into a grid laid out by createPaddedGrid, so the border
+# is always blocked and stepping off the map needs no bounds check. Directions
+# are (row step, col step) pairs. With 8 connectivity diagonal steps may not cut
+# the corner of an obstacle, matching the A* grid search.
+
+
+def _straightForced(free, cols, idx, dr, dc):
+    # Does a straight move into idx have a neighbor that can only be reached
+    # cheaply through idx?
+    if dc:
+        return ((free[idx - cols] and not free[idx - dc - cols]) or
+                (free[idx + cols] and not free[idx - dc + cols]))
+    return ((free[idx - 1] and not free[idx - 1 - dr * cols]) or
+            (free[idx + 1] and not free[idx + 1 - dr * cols]))
+
+
+def _jump4(free, cols, idx, dr, dc, goal_idx):
+    # Step from idx in a straight line until hitting a jump point or a wall.
+    step = dr * cols + dc
+    while True:
+        idx += step
+        if not free[idx]:
+            return None
+        if idx == goal_idx or _straightForced(free, cols, idx, dr, dc):
+            return idx
+        # Vertical moves stop wherever a horizontal jump would find something.
+        if dr and (_jump4(free, cols, idx, 0, 1, goal_idx) is not None or
+                   _jump4(free, cols, idx, 0, -1, goal_idx) is not None):
+            return idx
+
+
+def _jump8(free, cols, idx, dr, dc, goal_idx):
+    # Step from idx in a straight or diagonal line until hitting a jump point or
+    # a cell the line can't continue past.
+    step = dr * cols + dc
+    while True:
+        idx += step
+        if not free[idx]:
+            return None
+        if idx == goal_idx:
+            return idx
+        if dr and dc:
+            # Diagonal moves stop wherever a straight jump would find something.
+            if (_jump8(free, cols, idx, 0, dc, goal_idx) is not None or
+                    _jump8(free, cols, idx, dr, 0, goal_idx) is not None):
+                return idx
+        elif _straightForced(free, cols, idx, dr, dc):
+            return idx
+        if not (free[idx + step] and free[idx + dr * cols] and free[idx + dc]):
+            return None
+
+
+def _directions4(free, cols, idx, dr, dc):
+    # Pruned directions to search from idx when it was entered moving (dr, dc).
+    if not (dr or dc):
+        candidates = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+    elif dc:
+        candidates = [(-1, 0), (1, 0), (0, dc)]
+    else:
+        candidates = [(0, -1), (0, 1), (dr, 0)]
+    return [(r, c) for r, c in candidates if free[idx + r * cols + c]]
+
+
+def _directions8(free, cols, idx, dr, dc):
+    # Pruned directions to search from idx when it was entered moving (dr, dc).
+    directions = []
+    if not (dr or dc):
+        for r, c in [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)]:
+            if free[idx + r * cols] and free[idx + c] and free[idx + r * cols + c]:
+                directions.append((r, c))
+    elif dr and dc:
+        row_free = free[idx + dr * cols]
+        col_free = free[idx + dc]
+        if row_free:
+            directions.append((dr, 0))
+        if col_free:
+            directions.append((0, dc))
+        if row_free and col_free and free[idx + dr * cols + dc]:
+            directions.append((dr, dc))
+    else:
+        # Sides of a straight move, as (row step, col step) pairs.
+        sides = [(1, 0), (-1, 0)] if dc else [(0, 1), (0, -1)]
+        next_free = free[idx + dr * cols + dc]
+        if next_free:
+            directions.append((dr, dc))
+        for r, c in sides:
+            if free[idx + r * cols + c]:
+                if next_free and free[idx + (dr + r) * cols + dc + c]:
+                    directions.append((dr + r, dc + c))
+                directions.append((r, c))
+    return directions
+
+
+def findJumpPointPath(free, cols, connectivity, start_idx, goal_idx, record=None):
+    # Search from start_idx to goal_idx expanding only jump points. Returns the
+    # cells of the path from start to goal, empty if there is none, and the
+    # number of expansions. record(idx, fscore) is called on every expansion.
+    if connectivity == 4:
+        jump, directions = _jump4, _directions4
+    else:
+        jump, directions = _jump8, _directions8
+
+    if not (free[start_idx] and free[goal_idx]):
+        return [], 0
+
+    goal_row, goal_col = divmod(goal_idx, cols)
+
+    def cost_to_goal(idx):
+        row, col = divmod(idx, cols)
+        return math.sqrt((row - goal_row) ** 2 + (col - goal_col) ** 2)
+
+    def distance(idx1, idx2):
+        row1, col1 = divmod(idx1, cols)
+        row2, col2 = divmod(idx2, cols)
+        return math.sqrt((row1 - row2) ** 2 + (col1 - col2) ** 2)
+
+    # Search state per jump point. Only jump points ever get entries.
+    gscores = {start_idx: 0.0}
+    parents = {start_idx: -1}
+    closed = set()
+    counter = count(1)
+    open_set = [(cost_to_goal(start_idx), 0, start_idx, 0, 0)]
+    expansions = 0
+
+    while open_set:
+        c_fscore, _, c_idx, dr, dc = heappop(open_set)
+        if c_idx in closed:
+            continue
+        expansions += 1
+        if record is not None:
+            record(c_idx, c_fscore)
+
+        if c_idx == goal_idx:
+            # Fill in the cells between consecutive jump points.
+            jump_points = [c_idx]
+            while parents[jump_points[-1]] >= 0:
+                jump_points.append(parents[jump_points[-1]])
+            jump_points.reverse()
+
+            path = [start_idx]
+            for idx in jump_points[1:]:
+                row1, col1 = divmod(path[-1], cols)
+                row2, col2 = divmod(idx, cols)
+                n_steps = max(abs(row2 - row1), abs(col2 - col1))
+                step = ((row2 - row1) // n_steps) * cols + (col2 - col1) // n_steps
+                path.extend(range(path[-1] + step, idx + step, step))
+            return path, expansions
+
+        closed.add(c_idx)
+        c_gscore = gscores[c_idx]
+        for n_dr, n_dc in directions(free, cols, c_idx, dr, dc):
+            n_idx = jump(free, cols, c_idx, n_dr, n_dc, goal_idx)
+            if n_idx is None or n_idx in closed:
+                continue
+
+            n_gscore = c_gscore + distance(c_idx, n_idx)
+            if n_gscore >= gscores.get(n_idx, float("inf")):
+                continue
+            gscores[n_idx] = n_gscore
+            parents[n_idx] = c_idx
+            heappush(open_set, (n_gscore + cost_to_goal(n_idx), next(counter), n_idx, n_dr, n_dc))
+
+    return [], expansions
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file landmarks.py Module for landmark (ALT) heuristics on grid maps.
+
+import numpy as np
+from astar_rough import Searcher
+from node_maps import mapDigest
+from nodes import Node
+
+# Landmark tables hold the cost from each landmark to every cell of the map. By
+# the triangle inequality |d(L, goal) - d(L, cell)| never overestimates the cost
+# from cell to goal, so the largest of these over all landmarks is an admissible
+# and consistent heuristic that follows the walls of the map.
+
+# Stands in for the inf cost of cells a landmark cannot reach, so two of them
+# cancel to 0 instead of nan. Bounds this large mean the cell cannot reach the goal.
+UNREACHABLE = 1e30
+
+
+class Landmarks:
+    def __init__(self, states, distances, connectivity, digest):
+        # states are the (row, col) landmark cells and distances the matching
+        # cost tables, one map shaped array per landmark. Unreachable cells are inf.
+        # The costs are kept as one row per cell, so the bounds of a few rows of
+        # the map come from one contiguous block.
+        self._states = np.asarray(states, dtype=np.int64).reshape((-1, 2))
+        distances = np.asarray(distances, dtype=np.float64)
+        self._shape = distances.shape[1:]
+        costs = np.moveaxis(distances, 0, -1).reshape((-1, len(distances)))
+        self._costs = np.where(np.isfinite(costs), costs, UNREACHABLE)
+        self._connectivity = int(connectivity)
+        self._digest = digest
+
+    def get_digest(self):
+        return self._digest
+
+    def get_connectivity(self):
+        return self._connectivity
+
+    def get_states(self):
+        return self._states
+
+    def get_shape(self):
+        return self._shape
+
+    def landmark_count(self):
+        return len(self._states)
+
+    def nbytes(self):
+        return self._costs.nbytes
+
+    def check_grid(self, arr_map, connectivity):
+        # Raise ValueError unless the tables were built from this occupancy array
+        # with this connectivity. Bounds from a 4 connected map overestimate the
+        # cost of 8 connected searches and ones from another map can be anything.
+        if tuple(np.shape(arr_map)) != tuple(self.get_shape()):
+            raise ValueError("landmarks are for a %s map, not %s" % (self.get_shape(), np.shape(arr_map)))
+        if int(connectivity) != self._connectivity:
+            raise ValueError("landmarks are for %d connected searches, not %d" %
+                             (self._connectivity, connectivity))
+        if mapDigest(arr_map) != self._digest:
+            raise ValueError("landmarks were built from a different map")
+
+    def lower_bounds(self, goal_state, row_start=0, row_end=None):
+        # Lower bound on the cost from every cell to the goal, map shaped, or
+        # from the cells of rows row_start up to row_end. Cells a landmark cannot
+        # tell apart from the goal get 0 from it, cells that cannot reach the goal
+        # at all get inf.
+        cols = self._shape[1]
+        row_end = self._shape[0] if row_end is None else row_end
+        costs = self._costs[row_start * cols:row_end * cols]
+        bounds = np.zeros(len(costs))
+        if self.landmark_count():
+            goal_costs = self._costs[int(goal_state[0]) * cols + int(goal_state[1])]
+            np.abs(costs - goal_costs).max(axis=1, out=bounds)
+            bounds[bounds >= UNREACHABLE / 2] = float("inf")
+        return bounds.reshape((-1, cols))
+
+    def save(self, path):
+        costs = np.where(self._costs < UNREACHABLE, self._costs, float("inf"))
+        distances = np.moveaxis(costs.reshape(self._shape + (-1,)), -1, 0)
+        np.savez(path, states=self._states, distances=distances,
+                 connectivity=np.array(self._connectivity), digest=np.array(self._digest))
+
+
+def loadLandmarks(path, arr_map=None):
+    # Load landmarks written by Landmarks.save. If the map is given, the tables
+    # must have been built from it.
+    data = np.load(path)
+    landmarks = Landmarks(data['states'], data['distances'], data['connectivity'], str(data['digest']))
+    if arr_map is not None and mapDigest(arr_map) != landmarks.get_digest():
+        raise ValueError("landmarks " + str(path) + " were built from a different map")
+    return landmarks
+
+
+def buildLandmarks(arr_map, count=8, connectivity=4, seed=None):
+    # Pick landmarks by farthest point selection, each one the cell farthest from
+    # all landmarks so far, starting from the cell farthest from a random free
+    # cell. Landmarks only cover the part of the map reachable from that cell,
+    # elsewhere the searcher falls back to the straight line distance. Zeros are
+    # obstacles.
+    arr_map = np.asarray(arr_map)
+    s = Searcher()
+    s.add_grid(arr_map, connectivity)
+
+    states = []
+    distances = []
+    free_states = np.column_stack(np.nonzero(arr_map > 0))
+    if count > 0 and len(free_states):
+        rng = np.random.RandomState(seed)
+        nearest = s.find_distance_field(Node(free_states[rng.randint(len(free_states))]))[0]
+        while len(states) < count:
+            state = np.unravel_index(np.argmax(np.where(np.isfinite(nearest), nearest, -1.0)), nearest.shape)
+            state = (int(state[0]), int(state[1]))
+            if states and nearest[state] == 0:
+                # Every reachable cell is already a landmark.
+                break
+            states.append(state)
+            distances.append(s.find_distance_field(Node(state))[0])
+            nearest = distances[0] if len(distances) == 1 else np.fmin(nearest, distances[-1])
+
+    return Landmarks(states, np.array(distances).reshape((-1,) + arr_map.shape), connectivity,
+                     mapDigest(arr_map))
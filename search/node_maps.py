@@ -24,10 +24,20 @@
 
 ## @file node_maps.py Module for creating test maps.
 
+import hashlib
+import math
 from nodes import Node
 import numpy as np
+import os
 from PIL import Image
 
+# Graph files start with this magic number ('GRIDGRPH' as little endian bytes)
+# followed by the format version.
+GRAPH_FILE_MAGIC = 0x4850524744495247
+GRAPH_FILE_VERSION = 1
+# Header fields, all little endian int64.
+GRAPH_FILE_HEADER = ['magic', 'version', 'connectivity', 'rows', 'cols', 'n_nodes', 'n_edges', 'reserved']
+
 
 def createMap1():
     # Define nodes.
@@ -108,64 +118,252 @@ def createMap1():
     return [n0, n2, n3, n4, n5, n7, n9, n10, n11, n12, n14, n15, n16, n17, n18, n19]
 
 
-def getValidNeighbors(node, arr_map):
-    # Get matrix dimensions and generate valid indices.
-    map_dim = np.shape(arr_map)
-    node_state = node.get_state()
-    neighbor_states = []
+# Neighbor offsets as (row, col) steps, in the order neighbors are listed.
+GRID_OFFSETS_4 = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+GRID_OFFSETS_8 = GRID_OFFSETS_4 + [(-1, -1), (-1, 1), (1, -1), (1, 1)]
 
-    possible_states = [[node_state[0], node_state[1] - 1],
-                       [node_state[0], node_state[1] + 1],
-                       [node_state[0] - 1, node_state[1]],
-                       [node_state[0] + 1, node_state[1]]]
 
-    for state in possible_states:
-        if state[0] >= 0 and state[0] < map_dim[0] and state[1] >= 0 and state[1] < map_dim[1]:
-            if arr_map[state[0]][state[1]] > 0:
-                neighbor_states.append(np.array([state[0], state[1]]))
+def gridOffsets(connectivity):
+    if connectivity == 4:
+        return GRID_OFFSETS_4
+    elif connectivity == 8:
+        return GRID_OFFSETS_8
+    raise ValueError("connectivity must be 4 or 8, not " + str(connectivity))
 
-    return neighbor_states
 
+def createPaddedGrid(arr_map, connectivity=4):
+    # Flatten the free cells of the occupancy array with a border of obstacles
+    # around it, so neighbors can be found by adding a fixed offset to a flat
+    # index without any bounds checks. Steps are (flat offset, row part, col
+    # part, cost); diagonal steps should check the row and col parts so they
+    # don't cut the corner of an obstacle. Zeros are obstacles.
+    free = np.pad(np.asarray(arr_map) > 0, 1, mode='constant')
+    cols = free.shape[1]
+    return free.ravel(), cols, paddedGridSteps(cols, connectivity)
 
-def createMapFromImage(image_path):
-    # Convert image to matrix.
-    im = Image.open(image_path)
-    arr_map = np.array(im)
 
-    # Get the node indices. Zeros are obstacles.
-    n_indices = np.where(arr_map > 0)
-    n_indices = np.matrix([n_indices[0], n_indices[1]]).T
+def paddedGridSteps(cols, connectivity=4):
+    # Steps through a padded grid with cols columns, see createPaddedGrid.
+    return [(dr * cols + dc, dr * cols, dc, math.sqrt(dr * dr + dc * dc)) for dr, dc in gridOffsets(connectivity)]
 
-    # Create nodes.
-    # node_set = set()
-    node_set = list()
-    dim = np.shape(n_indices)
-    for idx in range(0, dim[0]):
-        node_set.append(Node(n_indices[idx].A.squeeze()))
-        # node_set.add(Node(n_indices[idx].A.squeeze()))
 
-    print(str(len(node_set)) + " nodes added.")
+def _shiftedSlices(shape, offset):
+    # Slices selecting cells and the cells offset from them, clipped to the grid.
+    src = []
+    dst = []
+    for dim, step in zip(shape, offset):
+        src.append(slice(max(0, -step), dim - max(0, step)))
+        dst.append(slice(max(0, step), dim - max(0, -step)))
+    return tuple(src), tuple(dst)
+
+
+def createGridGraph(arr_map, connectivity=4):
+    # Build the adjacency of the free cells as a CSR structure. Node i sits at
+    # coords[i] and its neighbors are indices[indptr[i]:indptr[i + 1]]. Zeros are
+    # obstacles. Diagonal steps may not cut the corner of an obstacle.
+    offsets = gridOffsets(connectivity)
+    free = np.asarray(arr_map) > 0
+    if free.ndim != 2:
+        raise ValueError("occupancy map must be two dimensional")
+    coords = np.column_stack(np.nonzero(free))
+
+    # Number the free cells in row major order.
+    node_ids = np.full(free.shape, -1, dtype=np.int64)
+    node_ids[free] = np.arange(len(coords))
+
+    # Fill one column of the neighbor table per offset using shifted masks.
+    neighbors = np.full((len(coords), len(offsets)), -1, dtype=np.int64)
+    for col, offset in enumerate(offsets):
+        src, dst = _shiftedSlices(free.shape, offset)
+        valid = free[src] & free[dst]
+        if offset[0] and offset[1]:
+            valid &= free[dst[0], src[1]] & free[src[0], dst[1]]
+        neighbors[node_ids[src][valid], col] = node_ids[dst][valid]
+
+    # Compress the table, keeping the offset order within each node.
+    has_neighbor = neighbors >= 0
+    indptr = np.zeros(len(coords) + 1, dtype=np.int64)
+    np.cumsum(has_neighbor.sum(axis=1), out=indptr[1:])
+    indices = neighbors[has_neighbor]
+
+    return indptr, indices, coords
+
 
-    # Find neighbors.
-    num = float(len(node_set))
-    idx = float(0)
-    for node in node_set:
-        idx += 1.0
-        print("Percentage: " + str(idx/num))
-        neighbor_states = getValidNeighbors(node, arr_map)
-        if neighbor_states:
-            for state in neighbor_states:
-                n_node = Node(state)
-                # n_node = [cand_node for cand_node in node_set if (cand_node.get_state() == state).all()]
-                # if n_node:
-                #     node.add_neighbor(n_node[0])
-                n_idx = node_set.index(n_node)
-                if n_idx:
-                    node.add_neighbor(node_set[n_idx])
+def createMapFromArray(arr_map, connectivity=4, node_type=Node):
+    indptr, indices, coords = createGridGraph(arr_map, connectivity)
+    return createMapFromGraph(indptr, indices, coords, node_type)
+
+
+def createMapFromGraph(indptr, indices, coords, node_type=Node):
+    # Create a node for every cell of a CSR graph and link it to its neighbors.
+    node_set = [node_type(state) for state in coords]
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    for idx, node in enumerate(node_set):
+        for n_idx in indices[indptr[idx]:indptr[idx + 1]]:
+            node.add_neighbor(node_set[n_idx])
+
+    return node_set
+
+
+def loadOccupancyArray(image_path):
+    # Convert image to matrix. Zeros are obstacles.
+    im = Image.open(image_path)
+    return np.array(im)
+
+
+def _alignedSize(nbytes):
+    # Arrays in graph files start on 8 byte boundaries.
+    return (nbytes + 7) // 8 * 8
+
+
+def createGraph(arr_map, connectivity=4):
+    # The same dict as loadGraphFile returns, built in memory.
+    free, cols, _ = createPaddedGrid(arr_map, connectivity)
+    indptr, indices, coords = createGridGraph(arr_map, connectivity)
+    graph = dict(zip(GRAPH_FILE_HEADER, [GRAPH_FILE_MAGIC, GRAPH_FILE_VERSION, connectivity, len(free) // cols - 2,
+                                         cols - 2, len(coords), len(indices), 0]))
+    graph.update(free=free, indptr=indptr, indices=indices, coords=coords)
+    return graph
+
+
+def writeGraphFile(path, arr_map, connectivity=4, graph=None):
+    # Write the padded occupancy grid (see createPaddedGrid) and the CSR graph
+    # (see createGridGraph) of a map to a binary file that loadGraphFile can map
+    # straight back into memory, or the graph from createGraph if it is given.
+    # Written to a temporary file first so readers never see a partial file.
+    if graph is None:
+        graph = createGraph(arr_map, connectivity)
+    header = np.array([graph[name] for name in GRAPH_FILE_HEADER], dtype='<i8')
+
+    tmp_path = path + '.tmp' + str(os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            for arr in [header, graph['free'].astype(np.uint8), graph['indptr'].astype('<i8'),
+                        graph['indices'].astype('<i4'), graph['coords'].astype('<i4')]:
+                data = arr.tobytes()
+                f.write(data + b'\0' * (_alignedSize(len(data)) - len(data)))
+        os.rename(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def loadGraphFile(path):
+    # Memory map a file written by writeGraphFile. Returns a dict with the header
+    # fields and the read-only arrays 'free' (padded grid), 'indptr', 'indices'
+    # and 'coords'.
+    header = np.fromfile(path, dtype='<i8', count=len(GRAPH_FILE_HEADER))
+    graph = dict(zip(GRAPH_FILE_HEADER, header.tolist()))
+    if graph['magic'] != GRAPH_FILE_MAGIC or graph['version'] != GRAPH_FILE_VERSION:
+        raise ValueError(str(path) + " is not a version " + str(GRAPH_FILE_VERSION) + " graph file")
+
+    offset = header.nbytes
+    n_cells = (graph['rows'] + 2) * (graph['cols'] + 2)
+    for name, dtype, shape in [('free', np.bool_, (n_cells,)),
+                               ('indptr', '<i8', (graph['n_nodes'] + 1,)),
+                               ('indices', '<i4', (graph['n_edges'],)),
+                               ('coords', '<i4', (graph['n_nodes'], 2))]:
+        if np.prod(shape):
+            graph[name] = np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+        else:
+            graph[name] = np.zeros(shape, dtype=dtype)
+        offset += _alignedSize(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+
+    return graph
+
+
+def mapDigest(arr_map):
+    # Content hash of an occupancy array, used to tie saved graphs to their map.
+    free = np.ascontiguousarray(np.asarray(arr_map) > 0)
+    return hashlib.sha1(str(free.shape).encode() + free.tobytes()).hexdigest()
+
+
+def loadCachedGraph(image_path, connectivity=4, cache_dir=None):
+    # Graph of an image map from a file keyed by the image content, building and
+    # writing it first if there is none. Files go in a .graph_cache directory
+    # next to the image unless cache_dir is given. If the file can't be written,
+    # e.g. in a read-only directory, the graph built in memory is used.
+    with open(image_path, 'rb') as f:
+        digest = hashlib.sha1(f.read()).hexdigest()
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(image_path)), '.graph_cache')
+    path = os.path.join(cache_dir, digest + '.c' + str(connectivity) + '.graph')
+
+    if not os.path.exists(path):
+        graph = createGraph(loadOccupancyArray(image_path), connectivity)
+        try:
+            if not os.path.isdir(cache_dir):
+                os.makedirs(cache_dir)
+            writeGraphFile(path, None, connectivity, graph)
+        except (IOError, OSError):
+            return graph
+
+    return loadGraphFile(path)
+
+
+def createMapFromImage(image_path, connectivity=4, node_type=Node, cache_dir=None):
+    graph = loadCachedGraph(image_path, connectivity, cache_dir)
+    node_set = createMapFromGraph(graph['indptr'], graph['indices'], graph['coords'], node_type)
+    print(str(len(node_set)) + " nodes added.")
 
     return node_set
 
 
+def createMazeArray(rows, cols, seed=None):
+    # Carve a perfect maze of rows x cols cells with a randomized depth first search.
+    # Cells sit on odd indices and walls between them on even ones, so the array
+    # is (2 * rows + 1) x (2 * cols + 1). Zeros are obstacles.
+    rng = np.random.RandomState(seed)
+    arr_map = np.zeros((2 * rows + 1, 2 * cols + 1), dtype=np.uint8)
+    visited = np.zeros((rows, cols), dtype=bool)
+    steps = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+    stack = [(0, 0)]
+    visited[0, 0] = True
+    arr_map[1, 1] = 1
+    while stack:
+        r, c = stack[-1]
+        options = [(r + dr, c + dc) for dr, dc in steps
+                   if 0 <= r + dr < rows and 0 <= c + dc < cols and not visited[r + dr, c + dc]]
+        if not options:
+            stack.pop()
+            continue
+
+        n_r, n_c = options[rng.randint(len(options))]
+        visited[n_r, n_c] = True
+        # Open the cell and the wall between it and the current one.
+        arr_map[2 * n_r + 1, 2 * n_c + 1] = 1
+        arr_map[r + n_r + 1, c + n_c + 1] = 1
+        stack.append((n_r, n_c))
+
+    return arr_map
+
+
+def createRoomsArray(rows, cols, n_obstacles=20, seed=None):
+    # Open room with walls around it and randomly placed rectangular obstacles
+    # of up to a tenth of the room on a side. Zeros are obstacles.
+    rng = np.random.RandomState(seed)
+    arr_map = np.ones((rows, cols), dtype=np.uint8)
+    arr_map[[0, -1], :] = 0
+    arr_map[:, [0, -1]] = 0
+    for _ in range(n_obstacles):
+        height = rng.randint(1, max(2, rows // 10))
+        width = rng.randint(1, max(2, cols // 10))
+        row = rng.randint(1, max(2, rows - height))
+        col = rng.randint(1, max(2, cols - width))
+        arr_map[row:row + height, col:col + width] = 0
+
+    return arr_map
+
+
+def createRandomArray(rows, cols, obstacle_ratio=0.25, seed=None):
+    # Scatter single cell obstacles over roughly obstacle_ratio of the map. Zeros
+    # are obstacles.
+    rng = np.random.RandomState(seed)
+    return (rng.random_sample((rows, cols)) >= obstacle_ratio).astype(np.uint8)
+
+
 def main():
     m = createMapFromImage('Simple_maze_small1.png')
     from view_map import viewMap
@@ -59,3 +59,55 @@ class Node:
 
     def get_predecessor(self):
         return self._predecessor
+
+
+class GridNode(object):
+    # Compact node for integer grid coordinates. The row and col are packed into
+    # a single int key so equality is one int comparison. The hash matches Node's
+    # so the two can be looked up in the same sets and dicts.
+    __slots__ = ('_key', '_hash', '_neighbors', '_predecessor')
+
+    def __init__(self, state):
+        self.set_state(state)
+        self._neighbors = []
+        self._predecessor = None
+
+    def __eq__(self, node):
+        try:
+            return self._key == node._key
+        except AttributeError:
+            return (self.get_state() == node.get_state()).all()
+
+    def __ne__(self, node):
+        return not self == node
+
+    def __hash__(self):
+        return self._hash
+
+    def get_key(self):
+        return self._key
+
+    def get_neighbors(self):
+        return self._neighbors
+
+    def get_state(self):
+        return np.array([self._key >> 32, self._key & 0xFFFFFFFF])
+
+    def get_cost(self):
+        return float("inf")
+
+    def set_state(self, state):
+        row, col = int(state[0]), int(state[1])
+        if row < 0 or not 0 <= col <= 0xFFFFFFFF:
+            raise ValueError("grid coordinates must be non-negative, not " + str((row, col)))
+        self._key = (row << 32) | col
+        self._hash = hash((row, col))
+
+    def add_neighbor(self, neighbor):
+        self._neighbors.append(neighbor)
+
+    def set_predecessor(self, anode):
+        self._predecessor = anode
+
+    def get_predecessor(self):
+        return self._predecessor
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file path_cache.py Module for answering repeated path queries from cached goal searches.
+
+from collections import OrderedDict
+import hashlib
+import numpy as np
+import os
+import time
+from astar_rough import Searcher
+from node_maps import loadOccupancyArray
+from nodes import Node
+
+
+class PathCache:
+    def __init__(self, image_path, connectivity=4, max_bytes=64 * 2**20):
+        # Searches back from each goal once over the whole map and keeps the
+        # distance and predecessor arrays for the most recently used goals, up to
+        # max_bytes. The cache is dropped when the image content changes.
+        self._image_path = image_path
+        self._connectivity = connectivity
+        self._max_bytes = max_bytes
+        self._fields = OrderedDict()
+        self._nbytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._stat = None
+        self._digest = None
+        self._shape = None
+        self._searcher = None
+        self._refresh()
+
+    def _refresh(self):
+        # Stat first so the content is only hashed when the file was touched.
+        st = os.stat(self._image_path)
+        stat = (st.st_mtime, st.st_size)
+        if stat == self._stat:
+            return
+        self._stat = stat
+
+        with open(self._image_path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        if digest == self._digest:
+            return
+        self._digest = digest
+
+        arr_map = loadOccupancyArray(self._image_path)
+        self._shape = np.shape(arr_map)
+        self._searcher = Searcher()
+        self._searcher.add_grid(arr_map, self._connectivity)
+        self.clear()
+
+    def clear(self):
+        self._fields.clear()
+        self._nbytes = 0
+
+    def get_map_digest(self):
+        return self._digest
+
+    def get_stats(self):
+        return {'hits': self._hits, 'misses': self._misses,
+                'goals': len(self._fields), 'bytes': self._nbytes}
+
+    def _get_field(self, goal):
+        key = (int(goal[0]), int(goal[1]))
+        if key in self._fields:
+            self._hits += 1
+            # Mark as most recently used.
+            field = self._fields.pop(key)
+            self._fields[key] = field
+            return field
+
+        self._misses += 1
+        field = self._searcher.find_distance_field(Node(key))
+        nbytes = field[0].nbytes + field[1].nbytes
+        if nbytes > self._max_bytes:
+            # Too big to ever fit, so don't flush everything else for it.
+            return field
+
+        # Evict least recently used goals until it fits.
+        while self._nbytes + nbytes > self._max_bytes:
+            _, old_field = self._fields.popitem(last=False)
+            self._nbytes -= old_field[0].nbytes + old_field[1].nbytes
+        self._fields[key] = field
+        self._nbytes += nbytes
+        return field
+
+    def get_cost(self, start, goal):
+        # Cost of the cheapest path, inf if there is none.
+        self._refresh()
+        distance = self._get_field(goal)[0]
+        return float(distance[int(start[0]), int(start[1])])
+
+    def find_path(self, start, goal):
+        # States from start to goal as rows of an array, empty if the goal can't
+        # be reached.
+        self._refresh()
+        distance, predecessors = self._get_field(goal)
+        cols = self._shape[1]
+        idx = int(start[0]) * cols + int(start[1])
+        if distance.flat[idx] == float("inf"):
+            return np.zeros((0, 2), dtype=np.int64)
+
+        predecessors = predecessors.ravel()
+        path = [idx]
+        while predecessors[idx] >= 0:
+            idx = predecessors[idx]
+            path.append(idx)
+
+        return np.column_stack(np.divmod(np.array(path), cols))
+
+
+def main():
+    # Repeat queries against a couple of goals and time cold and warm lookups.
+    cache = PathCache('Simple_maze.png')
+    starts = [(14, 373), (300, 560), (585, 400)]
+    goals = [(585, 585), (300, 560)]
+
+    for label in ['cold', 'warm']:
+        for goal in goals:
+            for start in starts:
+                t_start = time.time()
+                path = cache.find_path(start, goal)
+                elapsed = time.time() - t_start
+                print("%s %s -> %s: %d states in %.6f s" % (label, str(start), str(goal), len(path), elapsed))
+
+    print(cache.get_stats())
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file path_io.py Module for writing and reading paths in bulk.
+
+import numpy as np
+import os
+
+# Paths are arrays of (row, col) states like Searcher.get_path_states. On disk
+# every point is stored as (x, y) = (col, row), the image coordinates that the
+# blob_tracking draw_path scripts read with np.loadtxt(path_file, delimiter=',').
+#
+# There are three formats:
+#   csv   One x,y line per point. Every path is preceded by a '# path <n>'
+#         comment line, which np.loadtxt skips, so a file holding one path is
+#         exactly what the draw_path scripts load. The comment lines give the
+#         number of paths, so a file of no paths is empty and an empty path is
+#         only its comment line. Lines before the first comment are a path.
+#   bin   A stream of records after a 16 byte header (magic, version, both
+#         little endian int64). Each record is an int64 point count followed by
+#         that many int32 (x, y) pairs.
+#   npz   All points in one (N, 2) int32 array and the start of each path in an
+#         offsets array of length paths + 1.
+PATH_FILE_MAGIC = 0x4d52545348544150
+PATH_FILE_VERSION = 1
+PATH_FORMATS = ('csv', 'bin', 'npz')
+
+
+def statesToPoints(states):
+    # (row, col) states to int32 (x, y) points.
+    states = np.asarray(states).reshape((-1, 2))
+    return np.ascontiguousarray(states[:, ::-1], dtype=np.int32)
+
+
+def pointsToStates(points):
+    # (x, y) points back to int64 (row, col) states.
+    points = np.asarray(points).reshape((-1, 2))
+    return np.ascontiguousarray(points[:, ::-1], dtype=np.int64)
+
+
+def pathFormat(path):
+    # Format of a path file from its extension, csv unless it is .bin or .npz.
+    ext = os.path.splitext(path)[1].lstrip('.').lower()
+    return ext if ext in ('bin', 'npz') else 'csv'
+
+
+class PathWriter:
+    def __init__(self, path, file_format=None):
+        # Stream paths to a csv or bin file one at a time, see the formats above.
+        # Only the path being written is ever held in memory.
+        self._format = file_format or pathFormat(path)
+        if self._format not in ('csv', 'bin'):
+            raise ValueError("paths can only be streamed as csv or bin, not " + str(self._format))
+        self._file = open(path, 'wb')
+        self._count = 0
+        if self._format == 'bin':
+            self._file.write(np.array([PATH_FILE_MAGIC, PATH_FILE_VERSION], dtype='<i8').tobytes())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def path_count(self):
+        return self._count
+
+    def write(self, states):
+        points = statesToPoints(states)
+        if self._format == 'bin':
+            self._file.write(np.array([len(points)], dtype='<i8').tobytes())
+            self._file.write(points.astype('<i4').tobytes())
+        else:
+            self._file.write(('# path %d\n' % self._count).encode())
+            np.savetxt(self._file, points, fmt='%d', delimiter=',')
+        self._count += 1
+
+    def write_many(self, paths):
+        for states in paths:
+            self.write(states)
+
+    def close(self):
+        self._file.close()
+
+
+def savePaths(path, paths, file_format=None):
+    # Write a sequence of paths in any of the formats, by default the one named by
+    # the extension.
+    file_format = file_format or pathFormat(path)
+    if file_format != 'npz':
+        with PathWriter(path, file_format) as writer:
+            writer.write_many(paths)
+        return
+
+    points = [statesToPoints(states) for states in paths]
+    offsets = np.zeros(len(points) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(p) for p in points])
+    all_points = np.concatenate(points) if points else np.zeros((0, 2), dtype=np.int32)
+    with open(path, 'wb') as f:
+        np.savez(f, points=all_points, offsets=offsets)
+
+
+def _splitPoints(points, offsets):
+    return [pointsToStates(points[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+
+
+def loadPaths(path, file_format=None):
+    # Read all paths of a file written by PathWriter or savePaths, as a list of
+    # (row, col) state arrays.
+    file_format = file_format or pathFormat(path)
+    if file_format == 'npz':
+        data = np.load(path)
+        return _splitPoints(data['points'], data['offsets'])
+
+    if file_format == 'bin':
+        data = np.fromfile(path, dtype=np.uint8)
+        header = np.frombuffer(data[:16].tobytes(), dtype='<i8')
+        if len(header) != 2 or header[0] != PATH_FILE_MAGIC:
+            raise ValueError(str(path) + " is not a path file")
+        if header[1] != PATH_FILE_VERSION:
+            raise ValueError("unsupported path file version " + str(header[1]))
+        # Walk the records, each point count tells where the next one starts.
+        paths = []
+        pos = 16
+        while pos < len(data):
+            n_points = int(np.frombuffer(data[pos:pos + 8].tobytes(), dtype='<i8')[0])
+            pos += 8
+            points = np.frombuffer(data[pos:pos + 8 * n_points].tobytes(), dtype='<i4')
+            paths.append(pointsToStates(points))
+            pos += 8 * n_points
+        return paths
+
+    # Paths in a csv file start at comment lines.
+    paths = []
+    lines = None
+    with open(path) as f:
+        for line in f:
+            if line.startswith('#'):
+                if lines is not None:
+                    paths.append(lines)
+                lines = []
+            elif line.strip():
+                if lines is None:
+                    lines = []
+                lines.append(line)
+    if lines is not None:
+        paths.append(lines)
+    return [pointsToStates(np.loadtxt(lines, delimiter=',', ndmin=2)) if lines else np.zeros((0, 2), dtype=np.int64)
+            for lines in paths]
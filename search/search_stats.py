@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file search_stats.py Module for collecting statistics on a search.
+
+import json
+import time
+
+# Highest resolution clock available.
+timer = getattr(time, 'perf_counter', time.time)
+
+
+class SearchStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self, mode=None):
+        self.mode = mode
+        self.found = False
+        # Nodes taken off the open set and expanded.
+        self.expanded = 0
+        # Entries pushed onto the open set, one per new or cheaper route.
+        self.generated = 0
+        # Pushes for states that were already open, i.e. cheaper routes found to
+        # them. Closed states are never reopened since the heuristics are
+        # consistent.
+        self.reopened = 0
+        # Entries popped from the open set that had been superseded.
+        self.stale = 0
+        self.open_peak = 0
+        self.heuristic_seconds = 0.0
+        self.queue_seconds = 0.0
+        # Everything else in the search loop, mostly neighbor generation.
+        self.neighbor_seconds = 0.0
+        self.total_seconds = 0.0
+        self._pops = 0
+        self._t_start = 0.0
+
+    def start(self, mode):
+        self.reset(mode)
+        self._t_start = timer()
+
+    def stop(self, expanded, found):
+        self.total_seconds = timer() - self._t_start
+        self.expanded = expanded
+        self.found = found
+        self.stale = max(0, self._pops - expanded)
+        if self.generated:
+            self.neighbor_seconds = max(0.0, self.total_seconds - self.heuristic_seconds - self.queue_seconds)
+
+    def count_states(self, states):
+        # Number of distinct states that went through the timed push.
+        self.reopened = max(0, self.generated - states)
+
+    def timed_push(self, push):
+        # Wrap heappush to count and time pushes and track the open set size.
+        def timedPush(heap, entry):
+            t_start = timer()
+            push(heap, entry)
+            self.queue_seconds += timer() - t_start
+            self.generated += 1
+            if len(heap) > self.open_peak:
+                self.open_peak = len(heap)
+        return timedPush
+
+    def timed_pop(self, pop):
+        # Wrap heappop to count and time pops.
+        def timedPop(heap):
+            t_start = timer()
+            entry = pop(heap)
+            self.queue_seconds += timer() - t_start
+            self._pops += 1
+            return entry
+        return timedPop
+
+    def timed_heuristic(self, cost_to_goal):
+        # Wrap a heuristic function to time it.
+        def timedHeuristic(node):
+            t_start = timer()
+            cost = cost_to_goal(node)
+            self.heuristic_seconds += timer() - t_start
+            return cost
+        return timedHeuristic
+
+    def as_dict(self):
+        return {'mode': self.mode,
+                'found': self.found,
+                'expanded': self.expanded,
+                'generated': self.generated,
+                'reopened': self.reopened,
+                'stale': self.stale,
+                'open_peak': self.open_peak,
+                'heuristic_seconds': self.heuristic_seconds,
+                'queue_seconds': self.queue_seconds,
+                'neighbor_seconds': self.neighbor_seconds,
+                'total_seconds': self.total_seconds}
+
+    def to_json(self, path=None):
+        # JSON text of the stats, also written to path if given.
+        text = json.dumps(self.as_dict(), indent=2, sort_keys=True)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text + '\n')
+        return text
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file smoothing.py Module for shortening grid paths with line of sight checks.
+
+import numpy as np
+
+# Cells checked at once by lineOfSight, to bound the memory of a batch.
+MAX_BATCH_CELLS = 1 << 20
+
+
+def _bresenhamCells(starts, ends, steps):
+    # Cells of Bresenham lines from starts to ends, as (row, col) arrays of shape
+    # (lines, steps + 1). Lines shorter than steps repeat their end cell.
+    delta = ends - starts
+    length = np.maximum(np.abs(delta).max(axis=1), 1)[:, np.newaxis]
+    k = np.minimum(np.arange(steps + 1)[np.newaxis, :], length)
+    # Round start + delta * k / length to the nearest cell in integer math.
+    rows = starts[:, 0:1] + (2 * delta[:, 0:1] * k + length) // (2 * length)
+    cols = starts[:, 1:2] + (2 * delta[:, 1:2] * k + length) // (2 * length)
+    return rows, cols
+
+
+def lineOfSight(free, starts, ends):
+    # Whether each straight line from starts[i] to ends[i] only crosses free
+    # cells of the 2D boolean array free. Lines are rasterized with Bresenham's
+    # algorithm, all lines of a batch at once. Where a line steps diagonally both
+    # cells beside the step must be free too, the same rule the grid search uses
+    # for diagonal steps, so a visible line can always be followed through free
+    # cells. The lines must stay inside the array.
+    starts = np.asarray(starts, dtype=np.int64).reshape((-1, 2))
+    ends = np.asarray(ends, dtype=np.int64).reshape((-1, 2))
+    visible = np.ones(len(starts), dtype=bool)
+    if not len(starts):
+        return visible
+
+    lengths = np.abs(ends - starts).max(axis=1)
+    # Lines of similar lengths go in the same batch so little work is padding.
+    order = np.argsort(lengths)
+    first = 0
+    while first < len(order):
+        last = first + 1
+        while last < len(order) and (last - first + 1) * (int(lengths[order[last]]) + 1) <= MAX_BATCH_CELLS:
+            last += 1
+        batch = order[first:last]
+        steps = int(lengths[batch].max())
+
+        rows, cols = _bresenhamCells(starts[batch], ends[batch], steps)
+        clear = free[rows, cols].all(axis=1)
+        if steps:
+            clear &= (free[rows[:, :-1], cols[:, 1:]] & free[rows[:, 1:], cols[:, :-1]]).all(axis=1)
+        visible[batch] = clear
+        first = last
+
+    return visible
+
+
+def smoothPath(free, states, window=32):
+    # Shorten a path of (row, col) states through the 2D boolean array free by
+    # greedy string pulling: from each waypoint jump to the farthest later state
+    # in sight. Candidates are checked window states at a time, and the window
+    # doubles while the farthest candidate is still in sight. Returns the kept
+    # waypoints, including the first and last state.
+    states = np.asarray(states, dtype=np.int64).reshape((-1, 2))
+    if len(states) < 3:
+        return states.copy()
+
+    waypoints = [0]
+    current = 0
+    while current < len(states) - 1:
+        size = window
+        while True:
+            last = min(len(states), current + 1 + size)
+            candidates = np.arange(current + 1, last)
+            visible = lineOfSight(free, np.repeat(states[current:current + 1], len(candidates), axis=0),
+                                  states[candidates])
+            # Neighboring states of a path are always in sight of each other.
+            farthest = candidates[np.nonzero(visible)[0][-1]] if visible.any() else current + 1
+            if farthest < last - 1 or last == len(states):
+                break
+            size *= 2
+        waypoints.append(farthest)
+        current = farthest
+
+    return states[waypoints]
+
+
+def pathLength(states):
+    # Euclidean length of a path through (row, col) states.
+    states = np.asarray(states, dtype=float).reshape((-1, 2))
+    return float(np.sqrt((np.diff(states, axis=0) ** 2).sum(axis=1)).sum())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+## @file test_astar_rough.py Tests for the astar searcher, run with pytest.
+
+import numpy as np
+import os
+import pytest
+from astar_rough import MODE_ASTAR
+from astar_rough import MODE_BIDIRECTIONAL
+from astar_rough import MODE_JPS
+from astar_rough import Searcher
+from cost_maps import loadCostMap
+from landmarks import buildLandmarks
+from node_maps import createMapFromArray
+from node_maps import loadOccupancyArray
+from nodes import Node
+
+MAP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def wallMap():
+    # Open 20x20 map with a closed off pocket in the bottom right corner.
+    arr_map = np.ones((20, 20), dtype=np.uint8)
+    arr_map[14, 14:] = 0
+    arr_map[14:, 14] = 0
+    return arr_map
+
+
+def findPath(s, start, goal):
+    s.set_start(Node(start))
+    s.set_goal(Node(goal))
+    s.find_path()
+    return s.get_path_states()
+
+
+def test_reused_grid_searcher_forgets_last_path():
+    for mode in (MODE_ASTAR, MODE_JPS, MODE_BIDIRECTIONAL):
+        s = Searcher(stats=True)
+        s.add_grid(wallMap(), 8)
+        s.set_mode(mode)
+        assert len(findPath(s, (0, 0), (10, 10))) == 11
+        assert s.get_stats().found
+        assert len(findPath(s, (0, 0), (5, 3))) == 6
+        # Goal inside the closed off pocket.
+        assert len(findPath(s, (0, 0), (17, 17))) == 0
+        assert s.path_length() == 0
+        assert not s.get_stats().found
+        # Goal on an obstacle.
+        assert len(findPath(s, (0, 0), (14, 16))) == 0
+        assert len(findPath(s, (0, 0), (10, 10))) == 11
+
+
+def test_reused_node_searcher_forgets_last_path():
+    nodes = dict((tuple(node.get_state()), node) for node in createMapFromArray(wallMap()))
+    s = Searcher(stats=True)
+    for start, goal, length in [((0, 0), (10, 10), 21), ((0, 0), (17, 17), 0), ((2, 2), (0, 0), 5)]:
+        s.set_start(nodes[start])
+        s.set_goal(nodes[goal])
+        assert s.find_path() == (length > 0)
+        assert s.path_length() == length
+        assert s.get_stats().found == (length > 0)
+
+
+def test_landmarks_must_match_the_grid():
+    arr_map = wallMap()
+    landmarks = buildLandmarks(arr_map, 4, 4, seed=0)
+    s = Searcher()
+    s.add_grid(arr_map, 4)
+    s.add_landmarks(landmarks)
+    s.add_grid(arr_map, 8)
+    with pytest.raises(ValueError):
+        s.add_landmarks(landmarks)
+    other_map = arr_map.copy()
+    other_map[3, 3] = 0
+    s.add_grid(other_map, 4)
+    with pytest.raises(ValueError):
+        s.add_landmarks(landmarks)
+
+
+def test_cost_maps_share_the_occupancy_of_the_image_maps(tmp_path):
+    for image_path in ['Simple_maze.png', 'Simple_maze_small1.png', 'map1.png', 'map2.png', 'map1.bmp']:
+        costs = loadCostMap(os.path.join(MAP_DIR, image_path), inflation_radius=3,
+                            cache_dir=str(tmp_path))
+        assert np.array_equal(np.isfinite(costs), loadOccupancyArray(os.path.join(MAP_DIR, image_path)) > 0)
+
+
+def test_cost_map_paths_are_not_smoothed_through_costly_cells():
+    # A cheap corridor around three sides of an expensive square.
+    costs = np.full((20, 20), 50.0)
+    costs[0, :] = 1
+    costs[:, -1] = 1
+    s = Searcher()
+    s.add_cost_map(costs, 8)
+    states = findPath(s, (0, 0), (19, 19))
+    assert np.array_equal(s.get_smoothed_path_states(), states)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+## @file test_path_io.py Tests for the path files, run with pytest.
+
+import numpy as np
+from path_io import PATH_FORMATS
+from path_io import loadPaths
+from path_io import savePaths
+
+
+def test_path_files_keep_the_number_of_paths(tmp_path):
+    paths = [np.array([[0, 0], [1, 1], [2, 1]]), np.zeros((0, 2), dtype=np.int64), np.array([[5, 4]])]
+    for file_format in PATH_FORMATS:
+        path_file = str(tmp_path / ('paths.' + file_format))
+        for saved in [[], [paths[1]], paths[:1], paths]:
+            savePaths(path_file, saved)
+            loaded = loadPaths(path_file)
+            assert len(loaded) == len(saved)
+            for states, loaded_states in zip(saved, loaded):
+                assert np.array_equal(states.reshape((-1, 2)), loaded_states)
+    # Single csv paths stay loadable by the draw_path scripts.
+    savePaths(str(tmp_path / 'one.csv'), paths[:1])
+    assert np.array_equal(np.loadtxt(str(tmp_path / 'one.csv'), delimiter=','), paths[0][:, ::-1])
@@ -38,31 +38,9 @@ def printMap(map):
             print("     Node State: " + str(neighbor.get_state()))
 
 
-def viewMap(map, path=[]):
-    # Edge segments.
-    map_edges = []
+def _pathSegments(path):
+    # Segments from each node of a path to its predecessor.
     path_edges = []
-
-    # Node colormap.
-    cm = plt.get_cmap('jet')
-    for node in map:
-        # Add vertices.
-        # Rows are x coordinates. Cols are y.
-        s = node.get_state()
-
-        # Get vertex cost and color.
-        c = node.get_cost()
-        # TODO: Maps need a way to be asked what the min and max costs are.
-        cost_range = [0, 1000]
-        color_range = [0.0, 1.0]
-        node_color = cm(np.interp(c, cost_range, color_range))
-        plt.plot(s[0], s[1], 'o', c=node_color, markersize=5)
-
-        # Add edges.
-        for n_node in node.get_neighbors():
-            s_n = n_node.get_state()
-            map_edges.append([s, s_n])
-
     for node in path:
         try:
             p_node = node.get_predecessor()
@@ -72,17 +50,76 @@ def viewMap(map, path=[]):
                 path_edges.append([node.get_state(), p_node.get_state()])
         except Exception:
             pass
+    return path_edges
+
 
-    map_edge_col = mc.LineCollection(map_edges)
-    path_edge_col = mc.LineCollection(path_edges, linewidth=5, label="Path")
-    plt.gca().add_collection(map_edge_col)
+def _costRange(costs):
+    # Range of the finite costs for the colormap, (0, 1) if there are none.
+    finite = costs[np.isfinite(costs)]
+    if not len(finite):
+        return 0.0, 1.0
+    return float(finite.min()), float(finite.max())
+
+
+def viewMap(map, path=[], raster=False):
+    # Draw all nodes with one scatter colored by cost and all edges with one line
+    # collection. With raster the nodes are painted into an image instead, one
+    # pixel per integer state, and edges are left out, which stays fast for maps
+    # with millions of nodes. Rows are x coordinates. Cols are y.
+    states = np.array([node.get_state() for node in map], dtype=float).reshape((-1, 2))
+    costs = np.array([node.get_cost() for node in map], dtype=float)
+
+    # Node colormap over the costs in the map, infinite costs get the top color.
+    cm = plt.get_cmap('jet')
+    vmin, vmax = _costRange(costs)
+    norm = plt.Normalize(vmin=vmin, vmax=vmax)
+    costs = np.where(np.isfinite(costs), costs, vmax)
+
+    if raster:
+        image = np.ma.masked_all((1, 1))
+        extent = None
+        if len(states):
+            cells = np.rint(states).astype(np.int64)
+            lower = cells.min(axis=0)
+            upper = cells.max(axis=0)
+            image = np.ma.masked_all((upper[1] - lower[1] + 1, upper[0] - lower[0] + 1))
+            image[cells[:, 1] - lower[1], cells[:, 0] - lower[0]] = costs
+            extent = (lower[0] - 0.5, upper[0] + 0.5, lower[1] - 0.5, upper[1] + 0.5)
+        mappable = plt.imshow(image, cmap=cm, norm=norm, origin='lower', extent=extent,
+                              interpolation='nearest')
+    else:
+        mappable = plt.scatter(states[:, 0], states[:, 1], c=costs, cmap=cm, norm=norm, s=25)
+
+        # Edge segments, from each node to each of its neighbors.
+        neighbor_states = [n_node.get_state() for node in map for n_node in node.get_neighbors()]
+        if neighbor_states:
+            counts = [len(node.get_neighbors()) for node in map]
+            map_edges = np.stack([np.repeat(states, counts, axis=0),
+                                  np.array(neighbor_states, dtype=float)], axis=1)
+            plt.gca().add_collection(mc.LineCollection(map_edges))
+
+    path_edge_col = mc.LineCollection(_pathSegments(path), linewidth=5, label="Path")
     plt.gca().add_collection(path_edge_col)
     plt.margins(0.1)
     plt.legend(loc='upper right', shadow=True, fontsize='large', numpoints=1)
     # Set colorbars for nodes.
-    sm = plt.cm.ScalarMappable(cmap=cm, norm=plt.Normalize(vmin=0, vmax=1000))
-    sm._A = []
-    colorbar = plt.colorbar(sm, shrink=0.9, pad=0.02)
+    colorbar = plt.colorbar(mappable, shrink=0.9, pad=0.02)
+    colorbar.set_label('Node Cost')
+
+    plt.show()
+
+
+def viewTrace(trace, path=[]):
+    # Expanded states from Searcher.get_trace, colored by their cost.
+    # Rows are x coordinates. Cols are y.
+    cm = plt.get_cmap('jet')
+    sc = plt.scatter(trace[:, 0], trace[:, 1], c=trace[:, 2], cmap=cm, s=25)
+
+    path_edge_col = mc.LineCollection(_pathSegments(path), linewidth=5, label="Path")
+    plt.gca().add_collection(path_edge_col)
+    plt.margins(0.1)
+    plt.legend(loc='upper right', shadow=True, fontsize='large', numpoints=1)
+    colorbar = plt.colorbar(sc, shrink=0.9, pad=0.02)
     colorbar.set_label('Node Cost')
 
     plt.show()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+#
+# Software Licence Agreement (MIT)
+#
+# Copyright (c) 2016 Griswald Brooks
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the "Software"), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED
+# TO THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF
+# CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+#
+
+##
+# @author Griswald Brooks
+
+
+## @file wavefront.py Module for planning paths to a shared goal with a wavefront.
+
+import matplotlib.pyplot as plt
+import numpy as np
+from node_maps import createPaddedGrid
+from node_maps import loadOccupancyArray
+
+# Distance of cells the wave never reaches.
+UNREACHED = -1
+
+
+class Wavefront:
+    def __init__(self, arr_map, connectivity=4):
+        # Cells are flat indices into the padded grid, see createPaddedGrid. Every
+        # step counts as one, so with 8 connectivity diagonals cost the same as
+        # straight steps.
+        self._shape = np.shape(arr_map)
+        self._free, self._cols, steps = createPaddedGrid(arr_map, connectivity)
+        self._steps = [step[:3] for step in steps]
+        self._distance = np.full(len(self._free), UNREACHED, dtype=np.int32)
+        self._goal = None
+
+    def _to_index(self, state):
+        return (int(state[0]) + 1) * self._cols + int(state[1]) + 1
+
+    def _to_state(self, idx):
+        row, col = divmod(idx, self._cols)
+        return [row - 1, col - 1]
+
+    def _can_step(self, idx, step):
+        flat_step, row_step, col_step = step
+        if not self._free[idx + flat_step]:
+            return False
+        if row_step and col_step:
+            return self._free[idx + row_step] and self._free[idx + col_step]
+        return True
+
+    def set_goal(self, state):
+        # Grow the wave out from the goal one ring at a time. The frontier is kept
+        # as an array of flat indices, so each ring is a handful of array ops.
+        self._goal = self._to_index(state)
+        self._distance.fill(UNREACHED)
+        if not self._free[self._goal]:
+            return
+
+        flat_steps = np.array([step[0] for step in self._steps])
+        row_steps = np.array([step[1] for step in self._steps])
+        col_steps = np.array([step[2] for step in self._steps])
+
+        self._distance[self._goal] = 0
+        frontier = np.array([self._goal])
+        ring = 0
+        while frontier.size:
+            ring += 1
+            # Every step out of every frontier cell.
+            src = np.repeat(frontier, len(flat_steps))
+            dst = src + np.tile(flat_steps, len(frontier))
+            valid = self._free[dst] & (self._distance[dst] == UNREACHED)
+            valid &= self._free[src + np.tile(row_steps, len(frontier))]
+            valid &= self._free[src + np.tile(col_steps, len(frontier))]
+
+            frontier = np.unique(dst[valid])
+            self._distance[frontier] = ring
+
+    def get_distance(self, state):
+        # Steps from the state to the goal, or UNREACHED.
+        return int(self._distance[self._to_index(state)])
+
+    def get_distance_field(self):
+        # Distances as an array the shape of the map.
+        field = self._distance.reshape((-1, self._cols))
+        return field[1:-1, 1:-1]
+
+    def find_path(self, state):
+        # Walk downhill from the start to the goal. Returns the states from start
+        # to goal as rows of an array, which is empty if the goal can't be reached.
+        idx = self._to_index(state)
+        if self._distance[idx] == UNREACHED:
+            return np.zeros((0, 2), dtype=np.int64)
+
+        path = [idx]
+        while idx != self._goal:
+            n_distance = self._distance[idx] - 1
+            for step in self._steps:
+                if self._distance[idx + step[0]] == n_distance and self._can_step(idx, step):
+                    idx += step[0]
+                    break
+            path.append(idx)
+
+        rows, cols = np.divmod(np.array(path), self._cols)
+        return np.column_stack([rows - 1, cols - 1])
+
+
+def main():
+    # Plan from a few starts to one goal with a single wavefront.
+    arr_map = loadOccupancyArray('Simple_maze_small1.png')
+    w = Wavefront(arr_map)
+    w.set_goal([38, 42])
+
+    field = w.get_distance_field().astype(float)
+    field[field == UNREACHED] = np.nan
+    plt.imshow(field, cmap='jet')
+    plt.colorbar(label='Steps to goal')
+
+    for start in [[85, 5], [5, 5], [130, 130]]:
+        path = w.find_path(start)
+        print("Start " + str(start) + ": " + str(len(path)) + " states")
+        if len(path):
+            # Rows are y in the image.
+            plt.plot(path[:, 1], path[:, 0], linewidth=2)
+
+    plt.show()
+
+if __name__ == '__main__':
+    main()